@@ -23,11 +23,13 @@ from ._core._releve import Releve
 from .data.cmsi import CmsiSyntaxonTable
 from .io._shapefile import ShapeFile
 from .io._mdb import Mdb
+from .io._dbf import DbfFile
 from .io._tv2db import Tv2Db
 from .io._tvxml import TvXml
 from .io._maptables import MapTables
 from .io._mapelements import MapElements
 from .io._mapdata import MapData
+from .io._mapcollection import MapCollection
 from .sampling._samplepolygonmap import SamplePolygonMap
 from .plots._sankey_two_maps import SankeyTwoMaps
 from .tools.sbbprojects import SbbProjects
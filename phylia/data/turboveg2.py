@@ -3,7 +3,7 @@
 import pandas as _pd
 from importlib import resources as _resources
 #import importlib as _importlib
-import geopandas as _gpd
+from ..io._dbf import read_dbf as _read_dbf
 from . import _data_turboveg2
 
 def tvabund_definition():
@@ -42,70 +42,70 @@ def tvremarks_definition():
 def floralist_nederlnd():
     """Turboveg2 taxonlist Floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Nederlnd') / 'species.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data
 
 
 def floralist_floranld():
     """Turboveg2 taxonlist Floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Floranld') / 'species.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data
 
 
 def floralist_floranld_2013():
     """Turboveg2 taxonlist Floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Floranld_2013') / 'species.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data
 
 
 def floralist_floranld_2017():
     """Turboveg2 taxonlist Floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Floranld_2017') / 'species.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data
 
 
 def floralist_floranld_2020():
     """Turboveg2 taxonlist Floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Floranld_2020') / 'species.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data
 
 
 def ecodata_nederlnd():
     """Turboveg2 ecodatabase for floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Nederlnd') / 'ecodbase.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data.set_index('SPECIES_NR', verify_integrity=True)
 
 
 def ecodata_floranld():
     """Turboveg2 ecodatabase for floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Floranld') / 'ecodbase.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data.set_index('SPECIES_NR', verify_integrity=True)
 
 
 def ecodata_floranld_2013():
     """Turboveg2 ecodatabase for floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Floranld_2013') / 'ecodbase.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data.set_index('SPECIES_NR', verify_integrity=True)
 
 
 def ecodata_floranld_2017():
     """Turboveg2 ecodatabase for floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Floranld_2017') / 'ecodbase.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data.set_index('SPECIES_NR', verify_integrity=True)
 
 
 def ecodata_floranld_2020():
     """Turboveg2 ecodatabase for floranld."""
     srcfile = _resources.files(_data_turboveg2).joinpath('Floranld_2020') / 'ecodbase.dbf'
-    data = _gpd.read_file(srcfile)
+    data = _read_dbf(srcfile)
     return data.set_index('SPECIES_NR', verify_integrity=True)
 
 
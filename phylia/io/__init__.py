@@ -12,12 +12,15 @@ information about the content of the polygons. Aditionally a shapefile
 
 """
 
+from ._dbf import DbfFile
+from ._cache import TableCache
 from ._mdb import Mdb
 from ._shapefile import ShapeFile
-from ._tv2db import Tv2Db
+from ._tv2db import Tv2Db, load_tv2_folders
 from ._tvxml import TvXml
 
 from ._maptables import MapTables
 from ._mapelements import MapElements
 from ._mapdata import MapData
+from ._mapcollection import MapCollection
 
@@ -0,0 +1,222 @@
+
+"""
+The module cache contains class TableCache that stores tables read
+from vegetation map source files in Parquet format, so unchanged
+source files do not have to be read again.
+
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+import geopandas as gpd
+
+from logging import getLogger
+logger = getLogger(__name__)
+
+
+class TableCache:
+    """
+    On-disk cache of tables in Parquet format
+
+    Methods
+    -------
+    key
+        Return cache key for source files.
+    get
+        Return dictionary of cached tables.
+    get_table
+        Return single cached table.
+    put
+        Store dictionary of tables.
+    evict
+        Remove least recently used entries.
+    """
+
+    MANIFEST = 'manifest.json'
+
+    # files that belong to an ESRI shapefile
+    SHAPEFILE_EXTENSIONS = ['.shp','.shx','.dbf','.prj','.cpg']
+
+    def __init__(self, cache_dir, max_size=2**30):
+        """
+        Parameters
+        ----------
+        cache_dir : str
+            Directory for cached tables. The directory is created if it
+            does not exist.
+        max_size : int, default 1 GB
+            Maximum total size of cached files in bytes. Least recently
+            used entries are removed when the cache is larger.
+
+        Notes
+        -----
+        Writing Parquet files requires package pyarrow.
+        """
+        self._cache_dir = str(cache_dir)
+        self._max_size = max_size
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self._cache_dir})'
+
+    def _source_files(self, filepath):
+        """Return list of files that make up a source file."""
+        base, ext = os.path.splitext(filepath)
+        if ext.lower()!='.shp':
+            return [filepath]
+        return [f'{base}{ext}' for ext in self.SHAPEFILE_EXTENSIONS
+            if os.path.isfile(f'{base}{ext}')]
+
+    def key(self, kind, filepaths):
+        """Return cache key for source files.
+
+        Parameters
+        ----------
+        kind : str
+            Kind of tables, for example 'maptables'.
+        filepaths : list
+            Paths to source files.
+
+        Returns
+        -------
+        str
+
+        Notes
+        -----
+        The key is computed from path, size and modification time of
+        the source files, so the key changes when a file is changed.
+        """
+        fingerprint = [kind]
+        for filepath in filepaths:
+            for fpath in self._source_files(filepath):
+                stat = os.stat(fpath)
+                fingerprint.append([os.path.abspath(fpath), stat.st_size,
+                    stat.st_mtime_ns])
+        text = json.dumps(fingerprint)
+        return f'{kind}_{hashlib.sha1(text.encode()).hexdigest()}'
+
+    def get(self, key):
+        """Return dictionary of cached tables, or None if key is not
+        in cache."""
+        entry = os.path.join(self._cache_dir, key)
+        manifest = os.path.join(entry, self.MANIFEST)
+        if not os.path.isfile(manifest):
+            return None
+
+        with open(manifest) as f:
+            items = json.load(f)
+        try:
+            tables = {}
+            for item in items:
+                fpath = os.path.join(entry, item['file'])
+                if item['geo']:
+                    tables[item['name']] = gpd.read_parquet(fpath)
+                else:
+                    tables[item['name']] = pd.read_parquet(fpath)
+        except Exception as err:
+            logger.warning((f'Could not read cache entry {entry}: '
+                f'{repr(err)}. Entry has been removed.'))
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # mark entry as recently used
+        os.utime(manifest)
+        return tables
+
+    def get_table(self, key, name, columns=None):
+        """Return single cached table, or None if key or table is not
+        in cache.
+
+        Parameters
+        ----------
+        key : str
+            Cache key as returned by method key().
+        name : str
+            Name of table.
+        columns : list, optional
+            Names of columns to read. If not given, all columns are
+            read.
+        """
+        entry = os.path.join(self._cache_dir, key)
+        manifest = os.path.join(entry, self.MANIFEST)
+        if not os.path.isfile(manifest):
+            return None
+
+        with open(manifest) as f:
+            items = {item['name']:item for item in json.load(f)}
+        if name not in items:
+            return None
+        fpath = os.path.join(entry, items[name]['file'])
+        try:
+            if items[name]['geo']:
+                return gpd.read_parquet(fpath, columns=columns)
+            return pd.read_parquet(fpath, columns=columns)
+        except Exception as err:
+            logger.warning((f'Could not read table {name} from cache entry '
+                f'{entry}: {repr(err)}.'))
+            return None
+
+    def put(self, key, tables):
+        """Store dictionary of tables in cache.
+
+        Parameters
+        ----------
+        key : str
+            Cache key as returned by method key().
+        tables : dict
+            Dictionary of table name and DataFrame or GeoDataFrame.
+
+        Returns
+        -------
+        bool
+            True if tables were stored.
+        """
+        entry = os.path.join(self._cache_dir, key)
+        tmpentry = f'{entry}.tmp{os.getpid()}'
+        os.makedirs(tmpentry, exist_ok=True)
+        try:
+            items = []
+            for number, (name, table) in enumerate(tables.items()):
+                item = {'name':name, 'file':f'{number}.parquet',
+                    'geo':isinstance(table, gpd.GeoDataFrame)}
+                table.to_parquet(os.path.join(tmpentry, item['file']))
+                items.append(item)
+            with open(os.path.join(tmpentry, self.MANIFEST), 'w') as f:
+                json.dump(items, f)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmpentry, entry)
+        except Exception as err:
+            logger.warning((f'Could not store tables in cache '
+                f'{self._cache_dir}: {repr(err)}.'))
+            shutil.rmtree(tmpentry, ignore_errors=True)
+            return False
+
+        self.evict()
+        return True
+
+    def _entries(self):
+        """Return list of (last access time, size, path) of entries."""
+        entries = []
+        for name in os.listdir(self._cache_dir):
+            entry = os.path.join(self._cache_dir, name)
+            manifest = os.path.join(entry, self.MANIFEST)
+            if not os.path.isfile(manifest):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, fname))
+                for fname in os.listdir(entry))
+            entries.append((os.path.getmtime(manifest), size, entry))
+        return sorted(entries)
+
+    def evict(self):
+        """Remove least recently used entries until total size of
+        cache is below maximum size."""
+        entries = self._entries()
+        total = sum(size for atime, size, entry in entries)
+        for atime, size, entry in entries:
+            if total<=self._max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
@@ -0,0 +1,57 @@
+
+"""
+The module dates contains functions for converting date columns in
+tables from vegetation map source files to datetimes and for
+formatting datetimes as strings, without looping over values.
+
+"""
+
+import pandas as pd
+from pandas import Series
+
+
+def normalize_dates(values):
+    """Return values as datetime column.
+
+    Parameters
+    ----------
+    values : pd.Series | array-like
+        Dates as datetimes, strings or missing values.
+
+    Returns
+    -------
+    pd.Series
+        Column with datetime dtype. Values that are not valid dates
+        are returned as NaT.
+    """
+    values = Series(values, copy=False)
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+    return pd.to_datetime(values, errors='coerce')
+
+
+def format_dates(values, fmt='%d%m%Y'):
+    """Return dates formatted as strings.
+
+    Parameters
+    ----------
+    values : pd.Series | array-like
+        Dates as datetimes, strings or missing values.
+    fmt : str, default '%d%m%Y'
+        Date format as used by strftime.
+
+    Returns
+    -------
+    pd.Series
+        Formatted dates, with empty strings for missing values.
+
+    Notes
+    -----
+    Columns that contain only strings are assumed to be formatted
+    already and are returned with missing values replaced.
+    """
+    values = Series(values, copy=False)
+    if pd.api.types.infer_dtype(values, skipna=True) in ['string','empty']:
+        return values.fillna('')
+    dates = normalize_dates(values)
+    return dates.dt.strftime(fmt).fillna('')
@@ -0,0 +1,313 @@
+
+"""
+The module dbf contains class DbfFile for reading dBase III tables
+(.dbf files) as used by Turboveg2, with FoxPro memo files (.fpt).
+Records are decoded with numpy directly to typed columns, without
+using GDAL/fiona.
+
+"""
+
+import os
+import struct
+import numpy as np
+import pandas as pd
+
+from logging import getLogger
+logger = getLogger(__name__)
+
+
+class DbfFile:
+    """
+    Read dBase III table to pandas DataFrame
+
+    Attributes
+    ----------
+    fields
+        Return table of field definitions.
+    columns
+        Return list of field names.
+
+    Methods
+    -------
+    to_frame
+        Return table data as DataFrame.
+    """
+
+    # encodings for dBase language driver id
+    LANGUAGE_DRIVERS = {
+        0x01:'cp437',
+        0x02:'cp850',
+        0x03:'cp1252',
+        0x57:'cp1252',
+        0x64:'cp852',
+        0x65:'cp865',
+        0x66:'cp866',
+        0xC8:'cp1250',
+        }
+
+    # field types that can be read as another field type
+    COMPATIBLE_TYPES = {
+        'N':['N','F'],
+        'F':['N','F'],
+        }
+
+    def __init__(self, fpath, encoding=None):
+        """
+        Parameters
+        ----------
+        fpath : str
+            Filepath to dBase file.
+        encoding : str, optional
+            Encoding of text fields. If not given, encoding is derived
+            from the language driver id in the file header, with
+            latin-1 as default.
+
+        Notes
+        -----
+        Memo fields are read from a FoxPro memo file (.fpt) with the
+        same name as the dBase file. If no memo file is present, memo
+        fields are returned as empty values.
+        """
+        self._fpath = str(fpath)
+        if not os.path.isfile(self._fpath):
+            raise ValueError(f'{self._fpath} is not a valid filepath.')
+        self._fname = os.path.basename(self._fpath)
+
+        with open(self._fpath, 'rb') as f:
+            header = f.read(32)
+            (self._version, self._nrecords, self._headerlen,
+                self._recordlen) = struct.unpack('<B3xIHH', header[:12])
+            langid = header[29]
+            descriptors = f.read(self._headerlen - 32)
+
+        if encoding is None:
+            encoding = self.LANGUAGE_DRIVERS.get(langid, 'latin-1')
+        self._encoding = encoding
+
+        # field descriptors of 32 bytes, terminated by 0x0D
+        fields = []
+        offset = 1 # first byte of record is deletion flag
+        for pos in range(0, len(descriptors)-31, 32):
+            desc = descriptors[pos:pos+32]
+            if desc[0]==0x0D:
+                break
+            fields.append({
+                'field_name':desc[:11].split(b'\x00')[0].decode('ascii'),
+                'field_type':chr(desc[11]),
+                'field_len':desc[16],
+                'field_dec':desc[17],
+                'offset':offset,
+                })
+            offset += desc[16]
+        self._fields = pd.DataFrame(fields,
+            columns=['field_name','field_type','field_len','field_dec',
+            'offset']).set_index('field_name')
+
+    def __repr__(self):
+        return f'{self._fname} (n={len(self)})'
+
+    def __len__(self):
+        return self._nrecords
+
+    @property
+    def fields(self):
+        """Return table of field definitions."""
+        return self._fields.copy()
+
+    @property
+    def columns(self):
+        """Return list of field names."""
+        return list(self._fields.index)
+
+    def _read_records(self):
+        """Return memory-mapped array of records with one row of bytes
+        per record and boolean array of records that are not deleted,
+        or None if no records are deleted."""
+        filesize = os.path.getsize(self._fpath)
+        nrecords = max(filesize - self._headerlen, 0)//self._recordlen
+        if nrecords<self._nrecords:
+            logger.warning((f'Expected {self._nrecords} records but found '
+                f'{nrecords} in {self._fpath}.'))
+        nrecords = min(nrecords, self._nrecords)
+        if nrecords==0:
+            return np.zeros((0, self._recordlen), dtype='u1'), None
+
+        records = np.memmap(self._fpath, dtype='u1', mode='r',
+            offset=self._headerlen, shape=(nrecords, self._recordlen))
+
+        # first byte of deleted records is '*'
+        keep = records[:,0]!=ord('*')
+        if keep.all():
+            keep = None
+        return records, keep
+
+    def _field_bytes(self, records, keep, fieldname):
+        """Return array of bytes for field with one row per record."""
+        field = self._fields.loc[fieldname]
+        start = field['offset']
+        stop = start + field['field_len']
+        if keep is None:
+            return np.array(records[:,start:stop])
+        return records[keep,start:stop]
+
+    def _field_strings(self, fieldbytes):
+        """Return array of stripped bytestrings from field bytes."""
+        values = np.ascontiguousarray(fieldbytes).view(
+            f'S{fieldbytes.shape[1]}').ravel()
+        return np.char.strip(values)
+
+    def _decode_text(self, values):
+        """Return object array of strings, with None for empty values."""
+        text = np.char.decode(values, self._encoding).astype(object)
+        text[values==b''] = None
+        return text
+
+    def _decode_number(self, values):
+        """Return array of floats from bytestrings, with NaN for values
+        that can not be parsed."""
+        isnull = (values==b'') | (np.char.strip(values, b'*')==b'')
+        try:
+            return np.where(isnull, b'nan', values).astype('float64')
+        except ValueError:
+            text = np.char.decode(values, 'latin-1').astype(object)
+            return pd.to_numeric(pd.Series(text), errors='coerce'
+                ).to_numpy(dtype='float64')
+
+    def _decode_integer(self, fieldbytes):
+        """Return array of integers from field bytes, or None if field
+        contains missing values or characters other than digits, spaces
+        and a minus sign."""
+        isdigit = (fieldbytes>=ord('0')) & (fieldbytes<=ord('9'))
+        isminus = fieldbytes==ord('-')
+        if not (isdigit | isminus | (fieldbytes==ord(' '))).all():
+            return None
+        if not isdigit.any(axis=1).all():
+            return None
+
+        numbers = np.zeros(len(fieldbytes), dtype='int64')
+        digits = fieldbytes.astype('int64') - ord('0')
+        for col in range(fieldbytes.shape[1]):
+            numbers = np.where(isdigit[:,col], numbers*10 + digits[:,col],
+                numbers)
+        return np.where(isminus.any(axis=1), -numbers, numbers)
+
+    def _decode_memo(self, values):
+        """Return object array of memo texts from FoxPro memo file."""
+        memos = np.full(len(values), None, dtype=object)
+        fptpath = f'{os.path.splitext(self._fpath)[0]}.fpt'
+        if not os.path.isfile(fptpath):
+            fptpath = f'{os.path.splitext(self._fpath)[0]}.FPT'
+        if not os.path.isfile(fptpath):
+            logger.warning(f'Memo file for {self._fpath} not found.')
+            return memos
+
+        with open(fptpath, 'rb') as f:
+            memodata = f.read()
+        blocksize = struct.unpack('>H', memodata[6:8])[0]
+
+        for i, block in enumerate(values):
+            if block==b'' or int(block)==0:
+                continue
+            start = int(block)*blocksize
+            length = struct.unpack('>I', memodata[start+4:start+8])[0]
+            memos[i] = memodata[start+8:start+8+length].decode(
+                self._encoding).rstrip('\x00 ')
+        return memos
+
+    def _field_type(self, fieldname, fieldtypes):
+        """Return field type from fieldtypes if it is compatible with
+        the field type in the file header, else the header type."""
+        headertype = self._fields.loc[fieldname, 'field_type']
+        fieldtype = fieldtypes.get(fieldname, headertype)
+        if fieldtype==headertype or fieldtype=='C':
+            return fieldtype
+        if fieldtype in self.COMPATIBLE_TYPES.get(headertype, []):
+            return fieldtype
+        logger.warning((f'Field {fieldname} with type {headertype} can '
+            f'not be read as type {fieldtype} in {self._fpath}.'))
+        return headertype
+
+    def to_frame(self, columns=None, fieldtypes=None):
+        """Return table data as DataFrame.
+
+        Parameters
+        ----------
+        columns : list, optional
+            Names of fields to read. If not given, all fields are read.
+        fieldtypes : dict, optional
+            Dictionary of fieldname and dBase field type ('C','N','F',
+            'L','D' or 'M') to use instead of the type in the file
+            header. Fields not in fieldtypes are read as defined in
+            the file header. Types that are not compatible with the
+            type in the file header are ignored, all fields can be
+            read as text ('C').
+
+        Returns
+        -------
+        pd.DataFrame
+
+        Notes
+        -----
+        The file is memory-mapped and only the bytes of the requested
+        fields are copied and decoded.
+        """
+        if columns is None:
+            columns = self.columns
+        missing = [col for col in columns if col not in self._fields.index]
+        if missing:
+            raise KeyError(f'Fields {missing} not in {self._fpath}.')
+        if fieldtypes is None:
+            fieldtypes = {}
+
+        records, keep = self._read_records()
+        data = {}
+        for fieldname in columns:
+            field = self._fields.loc[fieldname]
+            fieldtype = self._field_type(fieldname, fieldtypes)
+            fieldbytes = self._field_bytes(records, keep, fieldname)
+
+            if fieldtype in ['N','F'] and field['field_dec']==0:
+                numbers = self._decode_integer(fieldbytes)
+                if numbers is None:
+                    numbers = self._decode_number(
+                        self._field_strings(fieldbytes))
+                data[fieldname] = numbers
+                continue
+
+            values = self._field_strings(fieldbytes)
+            if fieldtype in ['N','F']:
+                data[fieldname] = self._decode_number(values)
+            elif fieldtype=='L':
+                data[fieldname] = np.isin(values, [b'T',b't',b'Y',b'y'])
+            elif fieldtype=='D':
+                data[fieldname] = pd.to_datetime(self._decode_text(values),
+                    format='%Y%m%d', errors='coerce')
+            elif fieldtype=='M':
+                data[fieldname] = self._decode_memo(values)
+            else:
+                data[fieldname] = self._decode_text(values)
+
+        return pd.DataFrame(data, columns=columns)
+
+
+def read_dbf(fpath, columns=None, fieldtypes=None, encoding=None):
+    """Return dBase table as DataFrame.
+
+    Parameters
+    ----------
+    fpath : str
+        Filepath to dBase file.
+    columns : list, optional
+        Names of fields to read. If not given, all fields are read.
+    fieldtypes : dict, optional
+        Dictionary of fieldname and dBase field type to use instead of
+        the type in the file header.
+    encoding : str, optional
+        Encoding of text fields.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    return DbfFile(fpath, encoding=encoding).to_frame(columns=columns,
+        fieldtypes=fieldtypes)
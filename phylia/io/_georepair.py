@@ -0,0 +1,290 @@
+
+"""
+The module georepair contains functions for repairing polygon
+geometries from shapefiles with errors. Geometries are repaired as
+arrays with shapely, for all features of a layer at once.
+
+"""
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from logging import getLogger
+logger = getLogger(__name__)
+
+
+# columns of repair report
+REPORT_COLUMNS = ['fid','missing','badrings','invalid','emptyparts',
+    'dropped','error','solution']
+
+
+def _codes(values):
+    """Return contiguous integer codes for sorted integer values."""
+    return np.unique(values, return_inverse=True)[1]
+
+
+def _assemble(polygons, polygeom, ngeoms, singles):
+    """Return array of geometries from polygons and position of
+    geometry for each polygon.
+
+    Geometries without polygons are None, geometries in singles with
+    one polygon are returned as Polygon, other geometries as
+    MultiPolygon.
+    """
+    geometries = np.full(ngeoms, None, dtype=object)
+    if len(polygons)==0:
+        return geometries
+    positions = np.unique(polygeom)
+    multi = shapely.multipolygons(polygons, indices=_codes(polygeom))
+    nparts = np.bincount(polygeom, minlength=ngeoms)[positions]
+    single = singles[positions] & (nparts==1)
+    multi[single] = shapely.get_geometry(multi[single], 0)
+    geometries[positions] = multi
+    return geometries
+
+
+def polygons_from_coordinates(geomtypes, coordinates):
+    """Return polygons from ring coordinates, without rings with less
+    than three nodes.
+
+    Parameters
+    ----------
+    geomtypes : list
+        Geometry type of each feature, 'Polygon' or 'MultiPolygon'.
+    coordinates : list
+        GeoJSON coordinates of each feature.
+
+    Returns
+    -------
+    tuple of (np.ndarray, np.ndarray)
+        Array of geometries and number of rings dropped for each
+        feature. Geometries without valid rings and geometries of
+        other types are None.
+
+    Notes
+    -----
+    Use this function for geometries that can not be created by
+    shapely, because rings with less than three nodes are not valid
+    linear rings. A polygon is dropped when its exterior ring has less
+    than three nodes.
+    """
+    ngeoms = len(geomtypes)
+    rings, ringpoly, polygeom = [], [], []
+    for geomnr, (geomtype, coords) in enumerate(zip(geomtypes, coordinates)):
+        if geomtype not in ['Polygon','MultiPolygon']:
+            continue
+        polygons = [coords] if geomtype=='Polygon' else coords
+        for polygon in polygons:
+            for ring in polygon:
+                rings.append(np.asarray(ring, dtype='float64').reshape(-1,
+                    2 if len(ring)==0 else len(ring[0]))[:,:2])
+                ringpoly.append(len(polygeom))
+            polygeom.append(geomnr)
+    singles = np.array([geomtype=='Polygon' for geomtype in geomtypes],
+        dtype=bool)
+    if not rings:
+        return np.full(ngeoms, None, dtype=object), np.zeros(ngeoms, 'int64')
+
+    ringpoly = np.array(ringpoly)
+    polygeom = np.array(polygeom)
+    lengths = np.array([len(ring) for ring in rings])
+    coords = np.concatenate(rings)
+
+    # number of nodes, closing node not counted
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    closed = np.zeros(len(rings), dtype=bool)
+    nonempty = lengths>0
+    closed[nonempty] = (coords[starts[nonempty]]==coords[ends[nonempty]-1]
+        ).all(axis=1)
+    nnodes = lengths - (closed & (lengths>1))
+    isbad = nnodes<3
+
+    # polygons with invalid exterior ring are dropped
+    isshell = np.r_[True, ringpoly[1:]!=ringpoly[:-1]]
+    polybad = np.zeros(len(polygeom), dtype=bool)
+    polybad[ringpoly[isbad & isshell]] = True
+    keep = ~isbad & ~polybad[ringpoly]
+    badrings = np.bincount(polygeom[ringpoly[isbad]], minlength=ngeoms)
+
+    if not keep.any():
+        return np.full(ngeoms, None, dtype=object), badrings
+    linearrings = shapely.linearrings(coords[np.repeat(keep, lengths)],
+        indices=np.repeat(np.arange(keep.sum()), lengths[keep]))
+    keptpoly = np.unique(ringpoly[keep])
+    polygons = shapely.polygons(linearrings, indices=_codes(ringpoly[keep]))
+    geometries = _assemble(polygons, polygeom[keptpoly], ngeoms, singles)
+    return geometries, badrings
+
+
+def _count_nodes(rings):
+    """Return number of nodes of closed rings, repeated nodes are
+    counted once."""
+    coords, ringnr = shapely.get_coordinates(rings, return_index=True)
+    ncoords = shapely.get_num_coordinates(rings)
+    if len(coords)==0:
+        return ncoords
+    changed = (coords[1:]!=coords[:-1]).any(axis=1)
+    changed &= ringnr[1:]==ringnr[:-1]
+    return np.bincount(ringnr[1:][changed], minlength=len(rings))
+
+
+def _drop_degenerate_rings(geometries, polygonal, singles):
+    """Return number of degenerate rings dropped from each geometry.
+    Geometries are repaired in place."""
+    ngeoms = len(geometries)
+    badrings = np.zeros(ngeoms, dtype='int64')
+    positions = np.flatnonzero(polygonal)
+    if len(positions)==0:
+        return badrings
+
+    parts, partgeom = shapely.get_parts(geometries[positions],
+        return_index=True)
+    rings, ringpart = shapely.get_rings(parts, return_index=True)
+    isbad = _count_nodes(rings)<3
+    if not isbad.any():
+        return badrings
+
+    badrings[positions] = np.bincount(partgeom[ringpart[isbad]],
+        minlength=len(positions))
+
+    # rebuild geometries with degenerate rings from remaining rings
+    isshell = np.r_[True, ringpart[1:]!=ringpart[:-1]]
+    partbad = np.zeros(len(parts), dtype=bool)
+    partbad[ringpart[isbad & isshell]] = True
+    affected = np.zeros(len(positions), dtype=bool)
+    affected[partgeom[ringpart[isbad]]] = True
+    keep = ~isbad & ~partbad[ringpart] & affected[partgeom[ringpart]]
+
+    polygons = shapely.polygons(rings[keep], indices=_codes(ringpart[keep]))
+    keptparts = np.unique(ringpart[keep])
+    rebuilt = _assemble(polygons, partgeom[keptparts], len(positions),
+        singles[positions])
+    for pos in np.flatnonzero(affected):
+        if rebuilt[pos] is None:
+            rebuilt[pos] = shapely.from_wkt('POLYGON EMPTY')
+    geometries[positions[affected]] = rebuilt[affected]
+    return badrings
+
+
+def _keep_polygonal_parts(geometries, polygonal, singles):
+    """Return number of empty or non-polygonal parts dropped from each
+    polygonal geometry. Geometries are repaired in place."""
+    ngeoms = len(geometries)
+    emptyparts = np.zeros(ngeoms, dtype='int64')
+    positions = np.flatnonzero(polygonal & ~shapely.is_empty(geometries))
+    if len(positions)==0:
+        return emptyparts
+
+    # flatten collections and multipolygons to single parts
+    parts, partgeom = shapely.get_parts(geometries[positions],
+        return_index=True)
+    parts, subgeom = shapely.get_parts(parts, return_index=True)
+    partgeom = partgeom[subgeom]
+    keep = ((shapely.get_type_id(parts)==shapely.GeometryType.POLYGON)
+        & ~shapely.is_empty(parts))
+    typeids = shapely.get_type_id(geometries[positions])
+    iscollection = typeids==shapely.GeometryType.GEOMETRYCOLLECTION
+    if keep.all() and not iscollection.any():
+        return emptyparts
+
+    emptyparts[positions] = np.bincount(partgeom[~keep],
+        minlength=len(positions))
+    affected = (emptyparts[positions]>0) | iscollection
+    keep = keep & affected[partgeom]
+    rebuilt = _assemble(parts[keep], partgeom[keep], len(positions),
+        singles[positions] | iscollection)
+    geometries[positions[affected]] = rebuilt[affected]
+    return emptyparts
+
+
+def repair_geometries(geometries, fids=None, make_valid=True):
+    """Return repaired geometries and repair report.
+
+    Parameters
+    ----------
+    geometries : array-like
+        Shapely geometries, for example GeoSeries.values.
+    fids : array-like, optional
+        Feature ids used in report. Default is position.
+    make_valid : bool, default True
+        Repair invalid geometries with shapely.make_valid.
+
+    Returns
+    -------
+    tuple of (np.ndarray, pd.DataFrame)
+        Array of repaired geometries, with None for dropped features,
+        and table with one row for each repaired or dropped feature.
+
+    Notes
+    -----
+    Polygons and multipolygons are repaired in these steps:
+    - rings with less than three distinct nodes are dropped, polygons
+      with such an exterior ring are dropped;
+    - invalid geometries are made valid;
+    - empty and non-polygonal parts are dropped.
+    Features with missing or empty geometries are dropped. Other
+    geometry types are only made valid.
+    """
+    geometries = np.array(geometries, dtype=object)
+    ngeoms = len(geometries)
+    if fids is None:
+        fids = np.arange(ngeoms)
+    fids = np.asarray(fids)
+
+    missing = shapely.is_missing(geometries)
+    typeids = shapely.get_type_id(geometries)
+    polygonal = np.isin(typeids, [shapely.GeometryType.POLYGON,
+        shapely.GeometryType.MULTIPOLYGON])
+    singles = typeids==shapely.GeometryType.POLYGON
+
+    badrings = _drop_degenerate_rings(geometries, polygonal, singles)
+
+    invalid = np.zeros(ngeoms, dtype=bool)
+    if make_valid:
+        invalid = ~missing & ~shapely.is_valid(geometries)
+        geometries[invalid] = shapely.make_valid(geometries[invalid])
+
+    emptyparts = _keep_polygonal_parts(geometries, polygonal, singles)
+
+    dropped = shapely.is_missing(geometries) | shapely.is_empty(geometries)
+    geometries[dropped] = None
+
+    # one report row for each repaired feature
+    isreported = missing | (badrings>0) | invalid | (emptyparts>0) | dropped
+    positions = np.flatnonzero(isreported)
+    report = pd.DataFrame({
+        'fid':fids[positions],
+        'missing':missing[positions],
+        'badrings':badrings[positions],
+        'invalid':invalid[positions],
+        'emptyparts':emptyparts[positions],
+        'dropped':dropped[positions],
+        }, columns=REPORT_COLUMNS)
+    messages = [_messages(row) for row in report.itertuples()]
+    report['error'] = [error for error, solution in messages]
+    report['solution'] = [solution for error, solution in messages]
+    return geometries, report
+
+
+def _messages(row):
+    """Return error and solution text for row of repair report."""
+    if row.missing:
+        return 'Geometry type is None', f'Dropped record with fid={row.fid}'
+    errors, solutions = [], []
+    if row.badrings:
+        errors.append((f'Found {row.badrings} polygon rings with less '
+            f'than three nodes.'))
+        solutions.append((f'Dropped {row.badrings} invalid polygon rings '
+            f'with less than three nodes'))
+    if row.invalid:
+        errors.append('Invalid geometry.')
+        solutions.append('Made geometry valid')
+    if row.emptyparts:
+        errors.append(f'Found {row.emptyparts} empty or non-polygon parts.')
+        solutions.append(f'Dropped {row.emptyparts} parts')
+    if row.dropped:
+        errors.append('Geometry is empty.')
+        solutions.append(f'Dropped record with fid={row.fid}')
+    return ' '.join(errors), ', '.join(solutions)
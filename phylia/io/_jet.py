@@ -0,0 +1,520 @@
+
+"""
+The module jet contains class JetFile that reads tables from Microsoft
+Access mdb files (Jet3 and Jet4 database format) without an ODBC
+driver. Database pages are read directly from the file and rows are
+decoded per data page.
+
+The page layout follows the description of the Jet format by the
+mdbtools project.
+
+"""
+
+import os
+import struct
+import datetime
+import uuid
+
+from logging import getLogger
+logger = getLogger(__name__)
+
+
+class _JetFormat:
+    """Offsets in database pages for a Jet version."""
+
+    def __init__(self, version):
+        self.version = version
+        if version==3:
+            self.page_size = 2048
+            self.row_count_offset = 0x08
+            self.tab_num_rows_offset = 12
+            self.tab_num_cols_offset = 25
+            self.tab_num_ridxs_offset = 31
+            self.tab_usage_map_offset = 35
+            self.tab_cols_start_offset = 43
+            self.tab_ridx_entry_size = 8
+            self.col_flags_offset = 13
+            self.col_scale_offset = 10
+            self.col_size_offset = 16
+            self.col_num_offset = 1
+            self.tab_col_entry_size = 18
+            self.tab_col_offset_var = 3
+            self.tab_col_offset_fixed = 14
+        else:
+            self.page_size = 4096
+            self.row_count_offset = 0x0c
+            self.tab_num_rows_offset = 16
+            self.tab_num_cols_offset = 45
+            self.tab_num_ridxs_offset = 51
+            self.tab_usage_map_offset = 55
+            self.tab_cols_start_offset = 63
+            self.tab_ridx_entry_size = 12
+            self.col_flags_offset = 15
+            self.col_scale_offset = 12
+            self.col_size_offset = 23
+            self.col_num_offset = 5
+            self.tab_col_entry_size = 25
+            self.tab_col_offset_var = 7
+            self.tab_col_offset_fixed = 21
+
+
+class JetColumn:
+    """Column definition in Jet table."""
+
+    def __init__(self, name, coltype, colnum, varnum, fixed_offset,
+        size, scale, is_fixed):
+        self.name = name
+        self.coltype = coltype
+        self.colnum = colnum
+        self.varnum = varnum
+        self.fixed_offset = fixed_offset
+        self.size = size
+        self.scale = scale
+        self.is_fixed = is_fixed
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name})'
+
+    @property
+    def pytype(self):
+        """Return Python type of column values."""
+        return JetFile.PYTHON_TYPES.get(self.coltype, object)
+
+
+class JetFile:
+    """
+    Read tables from Microsoft Access mdb file in Jet3 or Jet4 format
+
+    Attributes
+    ----------
+    tablenames
+        Return list of user tablenames.
+
+    Methods
+    -------
+    get_columns
+        Return list of column definitions for table.
+    iter_rows
+        Yield rows of table as tuples.
+    """
+
+    MSYSOBJECTS_PAGE = 2
+
+    BOOL = 0x01
+    BYTE = 0x02
+    INT = 0x03
+    LONGINT = 0x04
+    MONEY = 0x05
+    FLOAT = 0x06
+    DOUBLE = 0x07
+    DATETIME = 0x08
+    BINARY = 0x09
+    TEXT = 0x0A
+    OLE = 0x0B
+    MEMO = 0x0C
+    GUID = 0x0F
+    NUMERIC = 0x10
+
+    PYTHON_TYPES = {
+        BOOL:bool, BYTE:int, INT:int, LONGINT:int, MONEY:float,
+        FLOAT:float, DOUBLE:float, DATETIME:datetime.datetime,
+        BINARY:bytes, TEXT:str, OLE:bytes, MEMO:str, GUID:str,
+        NUMERIC:float,
+        }
+
+    FIXED_FORMATS = {
+        BYTE:'<B', INT:'<h', LONGINT:'<i', MONEY:'<q', FLOAT:'<f',
+        DOUBLE:'<d', DATETIME:'<d',
+        }
+
+    def __init__(self, mdbpath, encoding='cp1252'):
+        """
+        Parameters
+        ----------
+        mdbpath : str
+            Valid filepath to .mdb file.
+        encoding : str, default 'cp1252'
+            Encoding of text in Jet3 files. Jet4 files store text as
+            unicode.
+        """
+        if not os.path.isfile(mdbpath):
+            raise ValueError(f'{mdbpath} is not a valid filepath.')
+        self._mdbpath = mdbpath
+        self._encoding = encoding
+
+        self._file = open(mdbpath, 'rb')
+        header = self._file.read(0x15)
+        if len(header)<0x15 or header[0]!=0x00 or header[4:19]!=b'Standard Jet DB':
+            self._file.close()
+            raise ValueError(f'{mdbpath} is not a Jet3 or Jet4 mdb file.')
+        self._format = _JetFormat(3 if header[0x14]==0 else 4)
+
+        self._tdefs = {}
+        self._tables = None
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}('
+            f'{os.path.basename(self._mdbpath)})')
+
+    def close(self):
+        """Close mdb file."""
+        self._file.close()
+
+    @property
+    def version(self):
+        """Return Jet version (3 or 4)."""
+        return self._format.version
+
+    def _read_page(self, pagenr):
+        """Return bytes of database page."""
+        self._file.seek(pagenr*self._format.page_size)
+        page = self._file.read(self._format.page_size)
+        if len(page)!=self._format.page_size:
+            raise ValueError((f'Page {pagenr} is beyond end of file '
+                f'{self._mdbpath}.'))
+        return page
+
+    @property
+    def _msysobjects(self):
+        """Return dictionary of table names and table definition pages."""
+        if self._tables is None:
+            self._tables = {}
+            columns = self.get_columns(self.MSYSOBJECTS_PAGE)
+            names = [col.name for col in columns]
+            for row in self.iter_rows(self.MSYSOBJECTS_PAGE):
+                obj = dict(zip(names, row))
+                if obj['Type'] is None or (obj['Type'] & 0x7fff)!=1:
+                    continue
+                self._tables[obj['Name']] = {
+                    'page' : obj['Id'] & 0x00ffffff,
+                    'flags' : obj['Flags'] or 0,
+                    }
+        return self._tables
+
+    @property
+    def tablenames(self):
+        """Return list of user tablenames."""
+        return [name for name, table in self._msysobjects.items()
+            if not name.startswith('MSys')
+            and not table['flags'] & 0x80000002]
+
+    def _tdef_page(self, table):
+        """Return table definition page number of table."""
+        if isinstance(table, int):
+            return table
+        try:
+            return self._msysobjects[table]['page']
+        except KeyError as e_info:
+            raise KeyError(f'No table with name "{table}" in {self._mdbpath}.')
+
+    def _read_tdef(self, pagenr):
+        """Return table definition as dictionary."""
+        if pagenr in self._tdefs:
+            return self._tdefs[pagenr]
+
+        fmt = self._format
+        page = self._read_page(pagenr)
+        if page[0]!=0x02:
+            raise ValueError(f'Page {pagenr} is not a table definition.')
+
+        # table definition may continue on next pages
+        buf = bytearray(page)
+        nextpage = struct.unpack_from('<I', page, 4)[0]
+        while nextpage:
+            page = self._read_page(nextpage)
+            buf += page[8:]
+            nextpage = struct.unpack_from('<I', page, 4)[0]
+
+        num_rows = struct.unpack_from('<I', buf, fmt.tab_num_rows_offset)[0]
+        num_cols = struct.unpack_from('<H', buf, fmt.tab_num_cols_offset)[0]
+        num_ridxs = struct.unpack_from('<I', buf, fmt.tab_num_ridxs_offset)[0]
+        usage_map = struct.unpack_from('<I', buf, fmt.tab_usage_map_offset)[0]
+
+        # column definitions
+        pos = fmt.tab_cols_start_offset + num_ridxs*fmt.tab_ridx_entry_size
+        coldefs = []
+        for i in range(num_cols):
+            coltype = buf[pos]
+            colnum = struct.unpack_from('<H', buf, pos+fmt.col_num_offset)[0]
+            varnum = struct.unpack_from('<H', buf, pos+fmt.tab_col_offset_var)[0]
+            fixed_offset = struct.unpack_from('<H', buf,
+                pos+fmt.tab_col_offset_fixed)[0]
+            size = struct.unpack_from('<H', buf, pos+fmt.col_size_offset)[0]
+            scale = buf[pos+fmt.col_scale_offset]
+            flags = buf[pos+fmt.col_flags_offset]
+            coldefs.append((coltype, colnum, varnum, fixed_offset, size,
+                scale, bool(flags & 0x01)))
+            pos += fmt.tab_col_entry_size
+
+        # column names
+        columns = []
+        for coldef in coldefs:
+            if fmt.version==3:
+                namelen = buf[pos]
+                name = bytes(buf[pos+1:pos+1+namelen]).decode(self._encoding)
+                pos += 1 + namelen
+            else:
+                namelen = struct.unpack_from('<H', buf, pos)[0]
+                name = bytes(buf[pos+2:pos+2+namelen]).decode('utf-16-le')
+                pos += 2 + namelen
+            columns.append(JetColumn(name, *coldef))
+
+        tdef = {
+            'num_rows' : num_rows,
+            'columns' : sorted(columns, key=lambda col: col.colnum),
+            'usage_map' : usage_map,
+            }
+        self._tdefs[pagenr] = tdef
+        return tdef
+
+    def get_columns(self, table):
+        """Return list of column definitions for table.
+
+        Parameters
+        ----------
+        table : str | int
+            Table name or table definition page number.
+
+        Returns
+        -------
+        list of JetColumn
+        """
+        return list(self._read_tdef(self._tdef_page(table))['columns'])
+
+    def _row_bytes(self, pointer):
+        """Return bytes of row from pointer with row number in first
+        byte and page number in last three bytes."""
+        page = self._read_page(pointer >> 8)
+        rownr = pointer & 0xff
+        start, stop = self._row_bounds(page, rownr)
+        return page[start:stop]
+
+    def _row_bounds(self, page, rownr):
+        """Return start and end position of row on data page."""
+        fmt = self._format
+        offset_pos = fmt.row_count_offset + 2 + rownr*2
+        start = struct.unpack_from('<H', page, offset_pos)[0] & 0x1fff
+        if rownr==0:
+            stop = fmt.page_size
+        else:
+            stop = struct.unpack_from('<H', page, offset_pos-2)[0] & 0x1fff
+        return start, stop
+
+    def _usage_pages(self, usage_map):
+        """Yield page numbers of data pages from table usage map."""
+        fmt = self._format
+        data = self._row_bytes(usage_map)
+
+        # inline usage map: start page and bitmap
+        if data[0]==0:
+            startpage = struct.unpack_from('<I', data, 1)[0]
+            for i, byte in enumerate(data[5:]):
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield startpage + i*8 + bit
+            return
+
+        # reference usage map: pages with bitmaps
+        pages_per_map = (fmt.page_size - 4)*8
+        for i in range((len(data)-1)//4):
+            mappage = struct.unpack_from('<I', data, 1+i*4)[0]
+            if mappage==0:
+                continue
+            bitmap = self._read_page(mappage)[4:]
+            for j, byte in enumerate(bitmap):
+                for bit in range(8):
+                    if byte & (1 << bit):
+                        yield i*pages_per_map + j*8 + bit
+
+    def _iter_page_rows(self, tdefpage, usage_map):
+        """Yield bytes of rows on data pages of table."""
+        fmt = self._format
+        for pagenr in self._usage_pages(usage_map):
+            page = self._read_page(pagenr)
+            if page[0]!=0x01 or struct.unpack_from('<I', page, 4)[0]!=tdefpage:
+                continue
+            num_rows = struct.unpack_from('<H', page, fmt.row_count_offset)[0]
+            for rownr in range(num_rows):
+                offset = struct.unpack_from('<H', page,
+                    fmt.row_count_offset + 2 + rownr*2)[0]
+
+                # deleted row
+                if offset & 0x8000:
+                    continue
+                start, stop = self._row_bounds(page, rownr)
+
+                # row is stored on another page
+                if offset & 0x4000:
+                    pointer = struct.unpack_from('<I', page, start)[0]
+                    yield self._row_bytes(pointer)
+                    continue
+
+                yield page[start:stop]
+
+    def _var_offsets(self, row, bitmask_sz):
+        """Return number of variable columns and list of offsets of
+        variable column data in row."""
+        if self._format.version==4:
+            row_end = len(row) - 1
+            num_var = struct.unpack_from('<H', row,
+                row_end - bitmask_sz - 1)[0]
+            offsets = [struct.unpack_from('<H', row,
+                row_end - bitmask_sz - 3 - i*2)[0] for i in range(num_var+1)]
+            return num_var, offsets
+
+        row_end = len(row) - 1
+        num_var = row[row_end - bitmask_sz]
+        num_jumps = row_end//256
+        col_ptr = row_end - bitmask_sz - num_jumps - 1
+        if (col_ptr - num_var)//256 < num_jumps:
+            num_jumps -= 1
+        offsets = []
+        jumps_used = 0
+        for i in range(num_var+1):
+            while (jumps_used<num_jumps
+                    and i==row[row_end - bitmask_sz - jumps_used - 1]):
+                jumps_used += 1
+            offsets.append(row[col_ptr - i] + jumps_used*256)
+        return num_var, offsets
+
+    def _decode_text(self, data):
+        """Return string from text data."""
+        if self._format.version==3:
+            return data.decode(self._encoding)
+
+        # compressed unicode starts with 0xFF 0xFE, a null byte toggles
+        # between single byte and two byte characters
+        if data[:2]==b'\xff\xfe':
+            chars = []
+            compressed = True
+            pos = 2
+            while pos<len(data):
+                if data[pos]==0:
+                    compressed = not compressed
+                    pos += 1
+                elif compressed:
+                    chars.append(chr(data[pos]))
+                    pos += 1
+                else:
+                    chars.append(data[pos:pos+2].decode('utf-16-le'))
+                    pos += 2
+            return ''.join(chars)
+        return data.decode('utf-16-le', errors='replace')
+
+    def _read_lval(self, data):
+        """Return bytes of memo or ole value."""
+        if len(data)<12:
+            return b''
+        length, pointer = struct.unpack_from('<II', data, 0)
+        flags = length & 0xc0000000
+        length = length & 0x3fffffff
+
+        # data stored in row
+        if flags==0x80000000:
+            return data[12:12+length]
+
+        # data stored in one row on other page
+        if flags==0x40000000:
+            return self._row_bytes(pointer)[:length]
+
+        # data stored in chain of rows on other pages
+        chunks = []
+        while pointer and sum(map(len, chunks))<length:
+            row = self._row_bytes(pointer)
+            pointer = struct.unpack_from('<I', row, 0)[0]
+            chunks.append(row[4:])
+        return b''.join(chunks)[:length]
+
+    def _decode_value(self, col, data):
+        """Return Python value from column data."""
+        coltype = col.coltype
+        if coltype in self.FIXED_FORMATS:
+            value = struct.unpack_from(self.FIXED_FORMATS[coltype], data)[0]
+            if coltype==self.MONEY:
+                return value/10000
+            if coltype==self.DATETIME:
+                return (datetime.datetime(1899,12,30)
+                    + datetime.timedelta(days=value))
+            return value
+        if coltype==self.TEXT:
+            return self._decode_text(data)
+        if coltype==self.MEMO:
+            return self._decode_text(self._read_lval(data))
+        if coltype==self.OLE:
+            return self._read_lval(data)
+        if coltype==self.GUID:
+            return '{' + str(uuid.UUID(bytes_le=bytes(data[:16]))).upper() + '}'
+        if coltype==self.NUMERIC:
+            # four 32-bit words with most significant word first
+            value = 0
+            for start in [1,5,9,13]:
+                value = (value << 32) + struct.unpack_from('<I', data, start)[0]
+            sign = -1 if data[0] & 0x80 else 1
+            return sign*value/10**col.scale
+        return bytes(data)
+
+    def _decode_row(self, row, columns, has_var):
+        """Return tuple of values for columns from row bytes."""
+        fmt = self._format
+        count_size = 1 if fmt.version==3 else 2
+        num_cols = row[0] if fmt.version==3 else struct.unpack_from('<H', row, 0)[0]
+        bitmask_sz = (num_cols + 7)//8
+        nullmask = row[len(row)-bitmask_sz:]
+        num_var, var_offsets = 0, []
+        if has_var:
+            num_var, var_offsets = self._var_offsets(row, bitmask_sz)
+
+        values = []
+        for col in columns:
+            isnull = True
+            if col.colnum//8 < len(nullmask):
+                isnull = not nullmask[col.colnum//8] & (1 << (col.colnum % 8))
+
+            if col.coltype==self.BOOL:
+                values.append(not isnull)
+                continue
+            if isnull:
+                values.append(None)
+                continue
+
+            if col.is_fixed:
+                start = col.fixed_offset + count_size
+                if col.coltype==self.NUMERIC:
+                    data = row[start:start+17]
+                else:
+                    data = row[start:start+col.size]
+            else:
+                if col.varnum>=num_var:
+                    values.append(None)
+                    continue
+                start = var_offsets[col.varnum]
+                stop = var_offsets[col.varnum+1]
+                data = row[start:stop]
+            values.append(self._decode_value(col, data))
+        return tuple(values)
+
+    def iter_rows(self, table, columns=None):
+        """Yield rows of table as tuples.
+
+        Parameters
+        ----------
+        table : str | int
+            Table name or table definition page number.
+        columns : list, optional
+            Names of columns to return. All columns are returned if not
+            given.
+
+        Yields
+        ------
+        tuple
+        """
+        tdefpage = self._tdef_page(table)
+        tdef = self._read_tdef(tdefpage)
+        tblcols = tdef['columns']
+        has_var = not all(col.is_fixed for col in tblcols)
+        if columns is not None:
+            colnames = {col.name.lower():col for col in tblcols}
+            tblcols = [colnames[name.lower()] for name in columns]
+
+        for row in self._iter_page_rows(tdefpage, tdef['usage_map']):
+            yield self._decode_row(row, tblcols, has_var)
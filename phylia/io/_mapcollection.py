@@ -0,0 +1,352 @@
+"""Module mapcollection contains class MapCollection for combining
+vegetation types of many vegetation maps in the format Digitale
+Standaard in one table, for statistics over many maps.
+
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from pandas import Series, DataFrame
+import pandas as pd
+import geopandas as gpd
+
+from ._mapdata import MapData
+from ._maptables import _join_indexer
+
+from logging import getLogger
+logger = getLogger(__name__)
+
+
+def _collect_map(mapdata):
+    """Return polygons, vegetation types and map properties of MapData
+    object."""
+    mapdata.load_geometry()
+    polygons = mapdata.polygons
+    if polygons.empty:
+        polygons = gpd.GeoDataFrame(
+            {'elmid':Series(dtype='str'), 'oppha':Series(dtype='float64')},
+            geometry=gpd.GeoSeries(crs=MapCollection.CRS))
+    polygons = polygons[['elmid','oppha','geometry']].reset_index(drop=True)
+    if polygons.crs is None:
+        polygons = polygons.set_crs(MapCollection.CRS)
+    elif not polygons.crs.equals(MapCollection.CRS):
+        polygons = polygons.to_crs(MapCollection.CRS)
+
+    maptables = mapdata.maptables
+    if maptables.is_valid:
+        vegtype = maptables.get_vegtype(loctype='v')
+        mapyear = mapdata.mapyear
+        if mapyear is None:
+            mapyear = maptables.get_mapyear()
+    else:
+        vegtype = DataFrame(columns=MapCollection.VEGTYPE_COLNAMES)
+        mapyear = mapdata.mapyear
+    vegtype = vegtype[MapCollection.VEGTYPE_COLNAMES].reset_index(drop=True)
+
+    # integer key from vegetation types to polygons, vegetation types
+    # are repeated for polygons with the same elmid
+    vegrows, polypos = _join_indexer(vegtype['elmid'].astype('str'),
+        polygons['elmid'].astype('str'))
+    vegtype = vegtype.iloc[vegrows].reset_index(drop=True)
+    vegtype['polygon'] = polypos
+
+    properties = {'mapname':mapdata.mapname, 'mapyear':mapyear,
+        'mdbpath':mapdata._maptblpath, 'polypath':mapdata._polypath}
+    return polygons, vegtype, properties
+
+
+def _read_map(mdbpath, polypath, mapyear, cache_dir):
+    """Return polygons, vegetation types, map properties and error for
+    map source files."""
+    try:
+        mapdata = MapData.from_filepaths(mdbpath=mdbpath, polypath=polypath,
+            mapyear=mapyear, cache_dir=cache_dir)
+        return (*_collect_map(mapdata), None)
+    except Exception as err:
+        error = {'errtype':err.__class__.__name__, 'errmsg':repr(err),}
+        return None, None, None, error
+
+
+class MapCollection:
+    """
+    Polygons and vegetation types of many vegetation maps
+
+    Polygons of all maps are stored in one GeoDataFrame and vegetation
+    types in one DataFrame, both with column map_id. Vegetation types
+    refer to polygons by integer position, so statistics over all maps
+    are computed without merging tables per map.
+
+    Constructor
+    -----------
+    from_mapdata
+        Create MapCollection from MapData objects.
+    from_filepaths
+        Create MapCollection from table of source files.
+
+    Methods
+    -------
+    get_vegtype
+        Return vegetation types of polygons.
+    get_area
+        Return area by vegetation type per map or per year.
+    query
+        Return polygons that intersect geometry.
+    """
+
+    CRS = 'epsg:28992'
+
+    VEGTYPE_COLNAMES = ['elmid','vegtype_code','vegtype_bedekkingnum',
+        'sbbcat_code','sbbcat_kortenaam']
+
+    MAP_COLNAMES = ['mapname','mapyear','mdbpath','polypath']
+
+    def __init__(self, polygons=None, vegtype=None, maps=None):
+        """Use MapCollection.from_mapdata() or
+        MapCollection.from_filepaths() to create a MapCollection.
+
+        Parameters
+        ----------
+        polygons : gpd.GeoDataFrame, optional
+            Polygons of all maps with columns map_id, elmid, oppha and
+            geometry.
+        vegtype : pd.DataFrame, optional
+            Vegetation types of all maps with column map_id and column
+            polygon with the position of the polygon in polygons.
+        maps : pd.DataFrame, optional
+            Table of map properties with map_id as index.
+        """
+        if maps is None:
+            maps = DataFrame(columns=self.MAP_COLNAMES,
+                index=pd.Index([], name='map_id'))
+        if polygons is None:
+            polygons = gpd.GeoDataFrame(
+                {'map_id':Series(dtype='str'), 'elmid':Series(dtype='str'),
+                'oppha':Series(dtype='float64')},
+                geometry=gpd.GeoSeries(crs=self.CRS))
+        if vegtype is None:
+            vegtype = DataFrame(columns=['map_id']+self.VEGTYPE_COLNAMES
+                +['polygon'])
+        self._polygons = polygons
+        self._vegtype = vegtype
+        self._maps = maps
+
+    def __repr__(self):
+        return f'MapCollection (maps={len(self)}, n={len(self._polygons)})'
+
+    def __len__(self):
+        return len(self._maps)
+
+    @classmethod
+    def _from_collected(cls, map_ids, results):
+        """Return MapCollection from collected map data."""
+        polygons, vegtype, maps = [], [], []
+        offset = 0
+        for map_id, (mappoly, mapveg, properties) in zip(map_ids, results):
+            mapveg = mapveg.copy()
+            mapveg['polygon'] = np.where(mapveg['polygon']>=0,
+                mapveg['polygon']+offset, -1)
+            offset += len(mappoly)
+            polygons.append(mappoly.assign(map_id=map_id))
+            vegtype.append(mapveg.assign(map_id=map_id))
+            maps.append(properties)
+
+        if not maps:
+            return cls()
+
+        map_ids = pd.Index(map_ids, name='map_id')
+        maps = DataFrame(maps, columns=cls.MAP_COLNAMES, index=map_ids)
+        polygons = pd.concat(polygons, ignore_index=True)
+        vegtype = pd.concat(vegtype, ignore_index=True)
+
+        # map_id as categorical with maps in collection order
+        for table in [polygons, vegtype]:
+            table['map_id'] = pd.Categorical(table['map_id'],
+                categories=map_ids)
+        polygons = gpd.GeoDataFrame(
+            polygons[['map_id','elmid','oppha','geometry']],
+            geometry='geometry', crs=cls.CRS)
+        vegtype = vegtype[['map_id']+cls.VEGTYPE_COLNAMES+['polygon']]
+        return cls(polygons=polygons, vegtype=vegtype, maps=maps)
+
+    @classmethod
+    def from_mapdata(cls, maps, workers=None):
+        """Create MapCollection from MapData objects.
+
+        Parameters
+        ----------
+        maps : list | dict
+            MapData objects, or dictionary of map_id and MapData
+            object. If a list is given, positions are used as map_id.
+            Geometry of MapData objects created with lazy_geometry=True
+            is loaded.
+        workers : int, optional
+            Number of threads for collecting data from maps. Defaults
+            to the number of processors.
+
+        Returns
+        -------
+        MapCollection
+        """
+        if not isinstance(maps, dict):
+            maps = dict(enumerate(maps))
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        map_ids = list(maps.keys())
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_collect_map, maps.values()))
+        return cls._from_collected(map_ids, results)
+
+    @classmethod
+    def from_filepaths(cls, filepaths, workers=None, cache_dir=None):
+        """Create MapCollection from table of source files.
+
+        Parameters
+        ----------
+        filepaths : pd.DataFrame
+            Table with map_id as index and columns mdbpath and polypath.
+            An optional column mapyear overrides the mapping year read
+            from the mdb file.
+        workers : int, optional
+            Number of worker processes. Defaults to the number of
+            processors. With workers=1 maps are read in the current
+            process.
+        cache_dir : str, optional
+            Directory for cached tables, as for MapData.from_filepaths.
+
+        Returns
+        -------
+        tuple of (MapCollection, pd.DataFrame)
+            Collection of maps and a table of maps that could not be
+            read.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        map_ids = list(filepaths.index)
+        mdbpaths = [None if pd.isna(path) else path
+            for path in filepaths['mdbpath']]
+        polypaths = [None if pd.isna(path) else path
+            for path in filepaths['polypath']]
+        if 'mapyear' in filepaths.columns:
+            mapyears = [None if pd.isna(year) else int(year)
+                for year in filepaths['mapyear']]
+        else:
+            mapyears = [None]*len(map_ids)
+        cache_dirs = [cache_dir]*len(map_ids)
+
+        if workers==1:
+            results = list(map(_read_map, mdbpaths, polypaths, mapyears,
+                cache_dirs))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_read_map, mdbpaths, polypaths,
+                    mapyears, cache_dirs))
+
+        collected, errors = {}, []
+        for map_id, mdbpath, polypath, result in zip(map_ids, mdbpaths,
+            polypaths, results):
+            if result[-1] is not None:
+                errors.append({'map_id':map_id, 'mdbpath':mdbpath,
+                    'polypath':polypath, **result[-1]})
+                continue
+            collected[map_id] = result[:-1]
+
+        errors = DataFrame(errors,
+            columns=['map_id','mdbpath','polypath','errtype','errmsg'])
+        collection = cls._from_collected(list(collected.keys()),
+            list(collected.values()))
+        return collection, errors
+
+    @property
+    def maps(self):
+        """Return table of map properties."""
+        return self._maps.copy()
+
+    @property
+    def polygons(self):
+        """Return polygons of all maps."""
+        return self._polygons
+
+    @property
+    def sindex(self):
+        """Return spatial index of polygons of all maps."""
+        return self._polygons.sindex
+
+    def get_vegtype(self):
+        """Return vegetation types of all maps with area of polygon.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        vegtype = self._vegtype.drop(columns=['polygon'])
+        vegtype['mapyear'] = self._mapyears()
+        vegtype['oppha'] = self._areas()
+        return vegtype
+
+    def _mapyears(self):
+        """Return array of mapping year for each vegetation type."""
+        mapyears = self._maps['mapyear'].to_numpy(dtype='float64')
+        return mapyears[self._vegtype['map_id'].cat.codes.to_numpy()]
+
+    def _areas(self):
+        """Return array of polygon area for each vegetation type."""
+        areas = np.append(self._polygons['oppha'].to_numpy(dtype='float64'),
+            np.nan)
+        return areas[self._vegtype['polygon'].to_numpy(dtype='int64')]
+
+    def get_area(self, by='sbbcat_code', per='map_id', weighted=False):
+        """Return area of vegetation types per map or per year.
+
+        Parameters
+        ----------
+        by : str, default 'sbbcat_code'
+            Vegetation type column, one of VEGTYPE_COLNAMES.
+        per : {'map_id','mapyear'}, default 'map_id'
+            Compute area for each map or for each mapping year.
+        weighted : bool, default False
+            Multiply polygon area with cover percentage of vegetation
+            type. If False, the full polygon area is counted for each
+            vegetation type in a polygon.
+
+        Returns
+        -------
+        pd.Series
+            Area in hectares with index levels per and by.
+        """
+        if by not in self.VEGTYPE_COLNAMES:
+            raise ValueError(f'Invalid column name {by}')
+        if per not in ['map_id','mapyear']:
+            raise ValueError(f'Invalid value for per: {per}')
+
+        areas = self._areas()
+        if weighted:
+            areas = areas*self._vegtype['vegtype_bedekkingnum'].to_numpy(
+                dtype='float64')/100
+        if per=='map_id':
+            groups = self._vegtype['map_id']
+        else:
+            groups = Series(self._mapyears(), name='mapyear')
+        table = DataFrame({per:groups.to_numpy(), by:self._vegtype[by],
+            'oppha':areas})
+        return table.groupby([per,by], observed=True, sort=True)['oppha'].sum()
+
+    def query(self, geometry, predicate='intersects'):
+        """Return polygons of all maps for geometry.
+
+        Parameters
+        ----------
+        geometry : shapely geometry
+            Geometry in crs epsg:28992.
+        predicate : str, default 'intersects'
+            Spatial predicate, as for GeoSeries.sindex.query.
+
+        Returns
+        -------
+        gpd.GeoDataFrame
+            Polygons with columns map_id, elmid, oppha and geometry.
+        """
+        positions = self.sindex.query(geometry, predicate=predicate)
+        return self._polygons.iloc[np.sort(positions)]
@@ -12,8 +12,9 @@ import pandas as pd
 from shapely.geometry import Point
 import geopandas as gpd
 
-from ._maptables import MapTables
+from ._maptables import MapTables, _join_indexer, _expand, _take
 from ._mapelements import MapElements
+from ._dates import format_dates
 
 import logging as _logging
 _logger = _logging.getLogger(__name__)
@@ -27,6 +28,15 @@ class MapData:
     ------------
     from_filepaths()
         Create MapData instance from filepaths.
+
+    Spatial queries
+    ---------------
+    query_points()
+        Return vegetation types of polygons at points.
+    query_bbox()
+        Return vegetation types of polygons in bounding box.
+    nearest()
+        Return vegetation types of polygons nearest to points.
         
     """
 
@@ -138,26 +148,77 @@ class MapData:
         self._polypath = self._mapelements_polygons._filepath
         self._linepath = self._mapelements_lines._filepath
 
-        self._poly = self._mapelements_polygons.shape
-        if not self._poly.empty:
-            self._poly = self._poly[['elmid','geometry']].copy()
-            self._poly = self._poly.astype({'elmid':'str'})
-            self._poly['oppha']=self._poly['geometry'].area/10000
-
-        self._lines = self._mapelements_lines.shape
-        if not self._lines.empty:
-            self._lines = self._lines[['elmid','geometry']].copy()
-            self._lines = self._lines.astype({'elmid':'str'})
+        self._set_elements()
 
         self.mapname = mapname
         self.mapyear = mapyear
 
+    @staticmethod
+    def _element_table(elements, area=False):
+        """Return table of map elements with columns elmid, geometry
+        and, if area is True, oppha. Map elements that have not been
+        loaded are returned without geometry."""
+        if elements.is_loaded:
+            table = elements.shape
+            if not table.empty:
+                table = table[['elmid','geometry']].copy()
+                table = table.astype({'elmid':'str'})
+                if area:
+                    table['oppha']=table['geometry'].area/10000
+            return table
+
+        attributes = elements.attributes
+        table = DataFrame({'elmid':attributes['elmid'].astype('str')})
+        if area:
+            table['oppha'] = attributes['area']/10000
+        return table
+
+    def _set_elements(self):
+        """Set tables of polygons and lines from map elements."""
+        self._poly = self._element_table(self._mapelements_polygons,
+            area=True)
+        self._lines = self._element_table(self._mapelements_lines)
+        self._has_geometry = (self._mapelements_polygons.is_loaded
+            and self._mapelements_lines.is_loaded)
+
+        # vegetation type rows of polygons for spatial queries
+        self._vegindex = None
+
+    def load_geometry(self):
+        """Read geometry of map elements for MapData created with
+        lazy_geometry=True.
+
+        Notes
+        -----
+        Until geometry has been loaded, properties polygons and lines
+        and methods get_vegtype(), get_vegtype_singlepoly(),
+        get_mapspecies() and get_abiotiek() return tables without
+        geometry. These tables have a row for each shapefile feature
+        with geometry and area computed by GDAL. After loading, rows
+        and area follow the geometries as read and repaired by
+        ShapeFile, which can differ for features with invalid
+        geometries.
+
+        Geometry is loaded by spatial queries query_points(),
+        query_bbox() and nearest() and by method to_shapefile().
+        """
+        if self._has_geometry:
+            return
+        self._mapelements_polygons.load()
+        self._mapelements_lines.load()
+        self._set_elements()
+
+    @property
+    def has_geometry(self):
+        """Return True if tables of polygons and lines have geometry."""
+        return self._has_geometry
+
     def __repr__(self):
         return f'MapData (n={self._maptbl.__len__()})'
 
     @classmethod
     def from_filepaths(cls, mdbpath=None, polypath=None, linepath=None,
-        mapname=None, mapyear=None):
+        mapname=None, mapyear=None, cache_dir=None, lazy_geometry=False):
         """Create MapData instance from filepaths
         
         Parameters
@@ -172,6 +233,13 @@ class MapData:
             Use defined name of the vegetation map.
         mapyear : str, optional
             Single mapping year.
+        cache_dir : str, optional
+            Directory for cached tables and spatial data. Unchanged
+            source files are read from cache.
+        lazy_geometry : bool, default False
+            Read only elmid and area of map elements. Tables of map
+            elements have no geometry until method load_geometry() is
+            called.
 
         Returns
         -------
@@ -180,17 +248,19 @@ class MapData:
         
         """
         if mdbpath:
-            tables = MapTables.from_mdb(mdbpath)
+            tables = MapTables.from_mdb(mdbpath, cache_dir=cache_dir)
         else:
             tables = MapTables()
 
         if polypath:
-            poly = MapElements.from_shapefile(polypath)
+            poly = MapElements.from_shapefile(polypath, cache_dir=cache_dir,
+                lazy=lazy_geometry)
         else:
             poly = MapElements()
 
         if linepath:
-            line = MapElements.from_shapefile(linepath)
+            line = MapElements.from_shapefile(linepath, cache_dir=cache_dir,
+                lazy=lazy_geometry)
         else:
             line = MapElements()
 
@@ -199,12 +269,16 @@ class MapData:
 
     @property
     def polygons(self):
-        """Return polygon geometry as GeoPandas dataframe"""
+        """Return polygon geometry as GeoPandas dataframe, without
+        geometry until load_geometry() has been called for MapData
+        created with lazy_geometry=True."""
         return self._poly
 
     @property
     def lines(self):
-        """Return line geometry as GeoPandas dataframe"""
+        """Return line geometry as GeoPandas dataframe, without
+        geometry until load_geometry() has been called for MapData
+        created with lazy_geometry=True."""
         return self._lines
 
     @property
@@ -212,6 +286,122 @@ class MapData:
         """Return outer boundary of mapped area"""
         return self._mapelements_polygons.boundary
 
+    def simplified_boundary(self, tolerance=1.0):
+        """Return simplified outer boundary of mapped area, covering
+        the boundary, for intersection pre-checks."""
+        return self._mapelements_polygons.simplified_boundary(
+            tolerance=tolerance)
+
+    def _vegtype_index(self):
+        """Return polygon attributes, vegetation types of polygons and
+        for each polygon position the number of vegetation types, start
+        position and row positions in vegetation types."""
+        if self._vegindex is None:
+            if self._maptbl.is_valid:
+                vegtype = self._maptbl.get_vegtype(loctype='v')
+            else:
+                vegtype = DataFrame(columns=['elmid'])
+            vegtype = vegtype.drop(columns=['oppha','geometry'],
+                errors='ignore').reset_index(drop=True)
+            # rows of polygons with geometry, as in the spatial index
+            self.load_geometry()
+            polygons = self._poly
+            if polygons.empty:
+                polygons = DataFrame({'elmid':Series([], dtype='str'),
+                    'oppha':Series([], dtype='float64')})
+            polygons = polygons[['elmid','oppha']]
+            polypos, vegrows = _join_indexer(polygons['elmid'],
+                vegtype['elmid'].astype('str'))
+            counts = np.bincount(polypos, minlength=len(polygons))
+            starts = np.cumsum(counts) - counts
+            self._vegindex = polygons, vegtype, counts, starts, vegrows
+        return self._vegindex
+
+    def _polygon_vegtype(self, positions):
+        """Return vegetation types of polygons at row positions, with
+        one row for each vegetation type and column for position in
+        positions."""
+        polygons, vegtype, counts, starts, vegrows = self._vegtype_index()
+        qidx, rows = _expand(counts[positions], starts[positions],
+            np.arange(len(vegrows)))
+        rows = vegrows[rows]
+        table = polygons.iloc[positions[qidx]].reset_index(drop=True)
+        for colname in vegtype.columns.drop('elmid'):
+            table[colname] = _take(vegtype[colname], rows)
+        return qidx, table
+
+    def query_points(self, xy, predicate='intersects'):
+        """Return vegetation types of polygons at points
+
+        Parameters
+        ----------
+        xy : np.ndarray
+            Point coordinates in crs epsg:28992 with shape (n,2), or
+            array of shapely points.
+        predicate : str, default 'intersects'
+            Spatial predicate, as for shapely.STRtree.query.
+
+        Returns
+        -------
+        pd.DataFrame
+            Vegetation types with column point for the position of the
+            point in xy. Points without polygon are not returned.
+
+        Notes
+        -----
+        The spatial index of polygons and the key from polygons to
+        vegetation types are created on first use and reused for next
+        queries.
+        """
+        pointpos, positions = self._mapelements_polygons._query_points(xy,
+            predicate=predicate)
+        qidx, table = self._polygon_vegtype(positions)
+        table.insert(0, 'point', pointpos[qidx])
+        return table
+
+    def query_bbox(self, xmin, ymin, xmax, ymax, predicate='intersects'):
+        """Return vegetation types of polygons in bounding box
+
+        Parameters
+        ----------
+        xmin, ymin, xmax, ymax : float
+            Bounding box coordinates in crs epsg:28992.
+        predicate : str, default 'intersects'
+            Spatial predicate, as for shapely.STRtree.query.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        positions = self._mapelements_polygons._query_bbox(xmin, ymin,
+            xmax, ymax, predicate=predicate)
+        qidx, table = self._polygon_vegtype(positions)
+        return table
+
+    def nearest(self, xy, max_distance=None):
+        """Return vegetation types of polygons nearest to points
+
+        Parameters
+        ----------
+        xy : np.ndarray
+            Point coordinates in crs epsg:28992 with shape (n,2), or
+            array of shapely points.
+        max_distance : float, optional
+            Maximum distance to polygon in meters.
+
+        Returns
+        -------
+        pd.DataFrame
+            Vegetation types with columns point for the position of
+            the point in xy and distance to the polygon.
+        """
+        pointpos, positions, distances = self._mapelements_polygons._nearest(
+            xy, max_distance=max_distance)
+        qidx, table = self._polygon_vegtype(positions)
+        table.insert(0, 'point', pointpos[qidx])
+        table.insert(1, 'distance', distances[qidx])
+        return table
+
     @property
     def maptables(self):
         """Return vegetation map tables."""
@@ -386,6 +576,9 @@ class MapData:
         if os.path.splitext(filepath)[1]!='.shp':
             filepath = os.path.splitext(filepath)[0]+'.shp'
 
+        # tables without geometry can not be saved
+        self.load_geometry()
+
         # get the right table 
         if tablename=='vegtype':
             table = self.get_vegtype(loctype=loctype)
@@ -407,14 +600,8 @@ class MapData:
 
             # date to string
             if 'datum' in table.columns: # shapefile has no datetime type
-                all_strings = all((v is np.nan) or isinstance(v, str) 
-                    for v in table['datum'])
-                if all_strings:
-                    table['datum'] = table['datum'].fillna('')
-                else:
-                    table['datum'] = table['datum'].apply(
-                        lambda x: x.strftime(
-                        '%d%m%Y') if not pd.isna(x) else '')
+                table['datum'] = format_dates(table['datum'],
+                    fmt=MapTables.DATE_FORMAT)
 
             # check if all columns are present
             shapecols = self._shapefile_colnames[tablename].values()
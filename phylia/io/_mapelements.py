@@ -1,10 +1,15 @@
 
+import os
 ##import warnings
+import numpy as np
 from pandas import Series, DataFrame
 import pandas as pd
 import geopandas as gpd
+import shapely
+import pyogrio
 
-from ._shapefile import ShapeFile
+from ._shapefile import ShapeFile, _restore_shx
+from ._cache import TableCache
 
 from logging import getLogger
 logger = getLogger(__name__)
@@ -25,6 +30,25 @@ class MapElements:
         Return sourcefile path
     boundary : shape
         Return outer boundary of mappend area
+    attributes : DataFrame
+        Return table of elmid and area, without geometry.
+    is_loaded : bool
+        Return True if spatial data have been read.
+    sindex : shapely.STRtree
+        Return spatial index of map elements.
+
+    Methods
+    -------
+    simplified_boundary : GeoSeries
+        Return simplified outer boundary for intersection pre-checks.
+    query_points : tuple
+        Return elmid of elements at points.
+    query_bbox : np.ndarray
+        Return elmid of elements in bounding box.
+    nearest : tuple
+        Return elmid of element nearest to points.
+    load : None
+        Read spatial data of lazy MapElements.
 
     Classmethods
     ------------
@@ -32,7 +56,8 @@ class MapElements:
         Create MapElements instance from shapefilepath.
     """
     
-    def __init__(self, shape=None, filepath=None):
+    def __init__(self, shape=None, filepath=None, attributes=None,
+        cache_dir=None):
         """MapElements constructor
         
         Parameters
@@ -41,16 +66,35 @@ class MapElements:
             Spatial data
         filepath : str, optional
             Sourcefile path (used for warnings)
+        attributes : DataFrame, optional
+            Table with columns elmid and area, for MapElements without
+            spatial data. Spatial data are read from filepath on first
+            access of shape.
+        cache_dir : str, optional
+            Directory for cached spatial data, used when spatial data
+            are read on first access.
 
         Notes
         -----
         Parameter shape is optional, however not giving a valid 
         shapefilepath results in an empty MapElements object.
         """
-        if shape is None:
+        if shape is None and attributes is None:
             shape = gpd.GeoDataFrame()
-        self._shape = shape
+        self._shape = None
+        self._attributes = attributes
         self._filepath = filepath
+        self._cache_dir = cache_dir
+        self._boundary = None
+        self._simplified = {}
+        self._tree = None
+
+        if shape is not None:
+            self._set_shape(shape)
+
+    def _set_shape(self, shape):
+        """Set spatial data with dutch grid crs and integer elmid."""
+        self._shape = shape
 
         if not self._shape.empty:
 
@@ -75,40 +119,90 @@ class MapElements:
                 # present.
                 self._shape = self._shape.to_crs(epsg=28992)
 
-            # ElmID dtype to int
-            if not pd.api.types.is_integer_dtype(self._shape['elmid']):
+            self._shape = self._clean_elmid(self._shape, self._filepath)
 
-                nmiss = len(self._shape["elmid"][self._shape["elmid"].isnull()])
-                if nmiss>0:
-                    # missing values found for ElmID in non-integer field:
-                    logger.warning((f'{nmiss} missing values in non-integer '
-                        f'ElmID field have been replaced with "9999" in '
-                        f'file {self._filepath}.'))
-                    self._shape['elmid'] = self._shape['elmid'].fillna(9999)
+    @staticmethod
+    def _clean_elmid(table, filepath=None):
+        """Return table with column elmid as integer."""
 
-                logger.warning((f'dtype "{self._shape["elmid"].dtype}" of '
-                    f'field ElmID has been changed to dtype "int" on file '
-                    f'{self._filepath}.'))
-                self._shape['elmid'] = self._shape['elmid'].astype(int)
+        # ElmID dtype to int
+        if not pd.api.types.is_integer_dtype(table['elmid']):
+
+            nmiss = len(table["elmid"][table["elmid"].isnull()])
+            if nmiss>0:
+                # missing values found for ElmID in non-integer field:
+                logger.warning((f'{nmiss} missing values in non-integer '
+                    f'ElmID field have been replaced with "9999" in '
+                    f'file {filepath}.'))
+                table['elmid'] = table['elmid'].fillna(9999)
+
+            logger.warning((f'dtype "{table["elmid"].dtype}" of '
+                f'field ElmID has been changed to dtype "int" on file '
+                f'{filepath}.'))
+            table['elmid'] = table['elmid'].astype(int)
+        return table
 
     def __repr__(self):
+        if not self.is_loaded:
+            return self._attributes.__repr__()
         return self._shape.__repr__()
         
     def __len__(self):
+        if not self.is_loaded:
+            return self._attributes.__len__()
         return self._shape.__len__()
 
     @property
     def shape(self):
-        """Return spatial data"""
+        """Return spatial data
+
+        Notes
+        -----
+        For MapElements created with lazy=True spatial data are read
+        on first access.
+        """
+        if self._shape is None:
+            self.load()
         return self._shape
 
+    def load(self):
+        """Read spatial data, if they have not been read."""
+        if self._shape is None:
+            elements = self.from_shapefile(self._filepath,
+                cache_dir=self._cache_dir)
+            self._shape = elements.shape
+
+    @property
+    def is_loaded(self):
+        """Return True if spatial data have been read."""
+        return self._shape is not None
+
+    @property
+    def attributes(self):
+        """Return table of elmid and area of elements
+
+        Notes
+        -----
+        For MapElements created with lazy=True this table has been
+        read without geometries.
+        """
+        if self._attributes is None:
+            if self._shape.empty:
+                self._attributes = DataFrame(
+                    {'elmid':Series(dtype='int64'),
+                    'area':Series(dtype='float64')})
+            else:
+                self._attributes = DataFrame({'elmid':self._shape['elmid'],
+                    'area':self._shape.area})
+        return self._attributes
+
     @property
     def colnames(self):
-        return list(self._shape)
+        return list(self.shape)
 
     @property
     def shape_type(self):
-        return list(set(self._shape.geom_type))[0].lower()
+        return list(set(self.shape.geom_type))[0].lower()
 
     @property
     def filepath(self):
@@ -116,15 +210,213 @@ class MapElements:
 
     @property
     def boundary(self):
-        """Return single polygon with boundary of mapped area"""
-        outline = self._shape.copy()
-        outline['boundary']=1
-        outline = outline.dissolve('boundary')
-        return outline.geometry
-        
+        """Return single polygon with boundary of mapped area
+
+        Notes
+        -----
+        The boundary is computed on first access and cached.
+        """
+        if self._boundary is None:
+            self._boundary = self._to_series(self._union_all(
+                self.shape.geometry.values if not self.shape.empty
+                else np.array([], dtype=object)))
+        return self._boundary
+
+    def simplified_boundary(self, tolerance=1.0):
+        """Return simplified boundary of mapped area
+
+        Parameters
+        ----------
+        tolerance : float, default 1.0
+            Maximum distance in meters between simplified and original
+            boundary.
+
+        Returns
+        -------
+        GeoSeries
+
+        Notes
+        -----
+        The simplified boundary is buffered with tolerance, so it
+        covers the boundary. Use it for quick intersection pre-checks
+        before intersecting with the boundary itself.
+        """
+        if tolerance not in self._simplified:
+            geometry = None
+            if not self.boundary.empty:
+                boundary = self.boundary.iloc[0]
+                geometry = shapely.simplify(boundary, tolerance)
+                # topology preserving simplification can move the
+                # boundary slightly more than tolerance, buffer has a
+                # small margin for rounding errors
+                distance = max(tolerance, shapely.hausdorff_distance(
+                    boundary, geometry))
+                geometry = shapely.buffer(geometry, 1.01*distance,
+                    join_style='mitre')
+            self._simplified[tolerance] = self._to_series(geometry)
+        return self._simplified[tolerance]
+
+    def _to_series(self, geometry):
+        """Return boundary geometry as GeoSeries with index boundary."""
+        geometry = [] if geometry is None else np.atleast_1d(geometry)
+        crs = None if self.shape.empty else self.shape.crs
+        return gpd.GeoSeries(geometry, crs=crs, name='geometry',
+            index=pd.Index([1]*len(geometry), name='boundary'))
+
+    @staticmethod
+    def _union_all(geometries, chunksize=64):
+        """Return union of geometries, or None if there are no
+        geometries.
+
+        Polygons that do not overlap, as in a vegetation map, are
+        merged with shapely.coverage_union_all. If polygons overlap,
+        or for other geometry types, geometries are merged in chunks
+        until one geometry is left.
+        """
+        geometries = np.asarray(geometries, dtype=object)
+        geometries = geometries[~shapely.is_missing(geometries)
+            & ~shapely.is_empty(geometries)]
+        if len(geometries)==0:
+            return None
+
+        typeids = shapely.get_type_id(geometries)
+        if np.isin(typeids, [shapely.GeometryType.POLYGON,
+            shapely.GeometryType.MULTIPOLYGON]).all():
+            try:
+                union = shapely.coverage_union_all(geometries)
+            except shapely.errors.GEOSException:
+                union = None
+            # union of polygons that overlap is invalid or smaller
+            if (union is not None and shapely.is_valid(union)
+                and np.isclose(shapely.area(union),
+                shapely.area(geometries).sum(), rtol=1e-9)):
+                return union
+
+        while len(geometries)>1:
+            nchunks = -(-len(geometries)//chunksize)
+            chunks = np.full(nchunks*chunksize, None, dtype=object)
+            chunks[:len(geometries)] = geometries
+            geometries = shapely.union_all(chunks.reshape(nchunks,
+                chunksize), axis=1)
+        return geometries[0]
+
+    @property
+    def sindex(self):
+        """Return spatial index of map elements
+
+        Notes
+        -----
+        The STRtree is built on first access and reused for all
+        queries. Positions returned by the tree are row positions in
+        shape.
+        """
+        if self._tree is None:
+            geometries = np.array([], dtype=object)
+            if not self.shape.empty:
+                geometries = np.asarray(self.shape.geometry.values)
+            self._tree = shapely.STRtree(geometries)
+        return self._tree
+
+    @staticmethod
+    def _as_points(xy):
+        """Return array of shapely points from array of coordinates
+        with shape (n,2), or from array of points."""
+        xy = np.asarray(xy)
+        if xy.dtype==object:
+            return xy
+        return shapely.points(xy.reshape(-1,2))
+
+    def _elmids(self, positions):
+        """Return elmid of elements at row positions."""
+        if self.shape.empty:
+            return np.array([], dtype='int64')
+        return self.shape['elmid'].to_numpy()[positions]
+
+    def _query_points(self, xy, predicate='intersects'):
+        """Return positions of points and row positions of elements."""
+        points = self._as_points(xy)
+        pointpos, positions = self.sindex.query(points, predicate=predicate)
+        return pointpos, positions
+
+    def _query_bbox(self, xmin, ymin, xmax, ymax, predicate='intersects'):
+        """Return row positions of elements in bounding box."""
+        positions = self.sindex.query(shapely.box(xmin, ymin, xmax, ymax),
+            predicate=predicate)
+        return np.sort(positions)
+
+    def _nearest(self, xy, max_distance=None):
+        """Return positions of points, row positions of nearest
+        elements and distances."""
+        points = self._as_points(xy)
+        (pointpos, positions), distances = self.sindex.query_nearest(points,
+            max_distance=max_distance, return_distance=True,
+            all_matches=False)
+        return pointpos, positions, distances
+
+    def query_points(self, xy, predicate='intersects'):
+        """Return elmid of elements at points
+
+        Parameters
+        ----------
+        xy : np.ndarray
+            Point coordinates with shape (n,2), or array of shapely
+            points.
+        predicate : str, default 'intersects'
+            Spatial predicate, as for shapely.STRtree.query. Use
+            'within' to exclude points on element borders.
+
+        Returns
+        -------
+        tuple of (np.ndarray, np.ndarray)
+            Positions of points in xy and elmid of matching elements.
+            Points without element are not returned, points on a
+            border between elements are returned for each element.
+        """
+        pointpos, positions = self._query_points(xy, predicate=predicate)
+        return pointpos, self._elmids(positions)
+
+    def query_bbox(self, xmin, ymin, xmax, ymax, predicate='intersects'):
+        """Return elmid of elements in bounding box
+
+        Parameters
+        ----------
+        xmin, ymin, xmax, ymax : float
+            Bounding box coordinates.
+        predicate : str, default 'intersects'
+            Spatial predicate, as for shapely.STRtree.query.
+
+        Returns
+        -------
+        np.ndarray
+        """
+        return self._elmids(self._query_bbox(xmin, ymin, xmax, ymax,
+            predicate=predicate))
+
+    def nearest(self, xy, max_distance=None):
+        """Return elmid of element nearest to points
+
+        Parameters
+        ----------
+        xy : np.ndarray
+            Point coordinates with shape (n,2), or array of shapely
+            points.
+        max_distance : float, optional
+            Maximum distance to element. Points without element within
+            max_distance are not returned.
+
+        Returns
+        -------
+        tuple of (np.ndarray, np.ndarray, np.ndarray)
+            Positions of points in xy, elmid of nearest element and
+            distance. If elements are at equal distance, one element
+            is returned.
+        """
+        pointpos, positions, distances = self._nearest(xy,
+            max_distance=max_distance)
+        return pointpos, self._elmids(positions), distances
 
     @classmethod
-    def from_shapefile(cls, filepath):
+    def from_shapefile(cls, filepath, cache_dir=None, lazy=False):
         """
         Create MapElements object from ESRI shapefile filepath."
 
@@ -132,6 +424,60 @@ class MapElements:
         ----------
         filepath : str
             valid filepath to ESRI shapefile
+        cache_dir : str, optional
+            Directory for cached tables. If given, spatial data are
+            stored in GeoParquet format on first read and read from
+            cache as long as the shapefile is unchanged.
+        lazy : bool, default False
+            Read only elmid and area of elements, from cache if
+            available. Geometries are read on first access of shape.
         """
+        if lazy and os.path.isfile(filepath):
+            attributes = None
+            if cache_dir is not None:
+                cache = TableCache(cache_dir)
+                attributes = cache.get_table(cache.key('mapelements',
+                    [filepath]), 'attributes')
+            if attributes is None:
+                attributes = cls._read_attributes(filepath)
+            if attributes is not None:
+                return cls(attributes=attributes, filepath=filepath,
+                    cache_dir=cache_dir)
+
+        if cache_dir is not None and os.path.isfile(filepath):
+            cache = TableCache(cache_dir)
+            key = cache.key('mapelements', [filepath])
+            tables = cache.get(key)
+            if tables is not None:
+                return cls(shape=tables['shape'], filepath=filepath,
+                    attributes=tables.get('attributes'))
+            elements = cls.from_shapefile(filepath)
+            if not elements.shape.empty:
+                cache.put(key, {'shape':elements.shape,
+                    'attributes':elements.attributes})
+            return elements
+
         shp = ShapeFile(filepath)
         return cls(shape=shp._shape,filepath=filepath)
+
+    @classmethod
+    def _read_attributes(cls, filepath):
+        """Return table of elmid and area of elements with geometry,
+        read without geometries, or None if shapefile can not be read.
+
+        Area is computed by GDAL, so geometries are not converted to
+        shapely geometries.
+        """
+        layer = os.path.splitext(os.path.basename(filepath))[0]
+        sql = (f'SELECT ElmID AS elmid, OGR_GEOM_AREA AS area FROM "{layer}" '
+            f'WHERE OGR_GEOMETRY IS NOT NULL')
+        try:
+            with _restore_shx():
+                attributes = pyogrio.read_dataframe(filepath, sql=sql,
+                    read_geometry=False, fid_as_index=True)
+        except Exception as err:
+            logger.warning((f'Attributes can not be read without geometry '
+                f'from {filepath}: {repr(err)}.'))
+            return None
+        attributes.index.name = 'fid'
+        return cls._clean_elmid(DataFrame(attributes), filepath)
@@ -1,10 +1,126 @@
 
+import os
+import warnings
 import numpy as np
 from pandas import Series, DataFrame
 import pandas as pd
 from collections import OrderedDict
-##import warnings
+from collections.abc import Mapping
 from ._mdb import Mdb
+from ._cache import TableCache
+from ._dates import normalize_dates, format_dates
+
+from logging import getLogger
+logger = getLogger(__name__)
+
+
+def _join_indexer(leftkeys, rightkeys, validate=None):
+    """Return positions of rows in left and right table for a left
+    join on key values.
+
+    Parameters
+    ----------
+    leftkeys : pd.Series
+        Key values of left table.
+    rightkeys : pd.Series
+        Key values of right table.
+    validate : {'one_to_many','many_to_one'}, optional
+        Raise MergeError if keys are not unique in left or right table.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Positions in left table and right table. Left positions are in
+        ascending order, right positions are -1 for rows without match.
+
+    Notes
+    -----
+    Rows are returned in the same order as pd.merge(how='left'), with
+    missing keys matching missing keys.
+    """
+    # key codes of right table, left keys coded by position in unique
+    # right keys or -1 if not in right table
+    rcodes, uniques = pd.factorize(rightkeys, use_na_sentinel=False)
+    lcodes = pd.Index(uniques).get_indexer(leftkeys)
+
+    counts = np.bincount(rcodes, minlength=len(uniques))
+    if validate=='one_to_many' and not pd.Index(leftkeys).is_unique:
+        raise pd.errors.MergeError(('Merge keys are not unique in left '
+            'dataset; not a one-to-many merge'))
+    if validate=='many_to_one' and counts.max(initial=0)>1:
+        raise pd.errors.MergeError(('Merge keys are not unique in right '
+            'dataset; not a many-to-one merge'))
+
+    # right rows sorted by key, each key a contiguous block
+    # position -1 selects an appended count of zero
+    order = np.argsort(rcodes, kind='stable')
+    starts = np.cumsum(counts) - counts
+    return _expand(np.append(counts, 0)[lcodes], np.append(starts, 0)[lcodes],
+        order)
+
+
+def _expand(nmatch, starts, order):
+    """Return left positions repeated for each match and positions in
+    order for matches, with -1 for left rows without match."""
+    nrep = np.maximum(nmatch, 1)
+    lidx = np.repeat(np.arange(len(nrep)), nrep)
+    offset = np.arange(nrep.sum()) - np.repeat(np.cumsum(nrep) - nrep, nrep)
+    hasmatch = np.repeat(nmatch>0, nrep)
+    ridx = np.full(len(lidx), -1, dtype='int64')
+    ridx[hasmatch] = order[np.repeat(starts, nrep)[hasmatch]
+        + offset[hasmatch]]
+    return lidx, ridx
+
+
+def _take(column, positions):
+    """Return column values by position, with missing values for
+    position -1."""
+    if isinstance(column.dtype, pd.api.extensions.ExtensionDtype):
+        values = column.array
+    else:
+        values = column.to_numpy()
+    return pd.api.extensions.take(values, positions, allow_fill=True)
+
+
+class _MdbTables(Mapping):
+    """Dictionary of MapTables tables that are read from mdb file on
+    first access.
+
+    The mdb file is opened only while a table is read, so no
+    connection is kept open between table reads."""
+
+    def __init__(self, filepath, tablenames, string_dtype=None):
+        self._filepath = filepath
+        self._string_dtype = string_dtype
+        self._tablenames = [name for name in tablenames
+            if not name.startswith('GDB_')]
+        self._tables = {}
+
+    def __getitem__(self, tblname):
+        if tblname not in self._tablenames:
+            raise KeyError(tblname)
+        if tblname not in self._tables:
+            self._tables[tblname] = self._read_table(tblname)
+        return self._tables[tblname]
+
+    def __iter__(self):
+        return iter(self._tablenames)
+
+    def __len__(self):
+        return len(self._tablenames)
+
+    def _read_table(self, tblname):
+        """Return cleaned table with only the columns used by MapTables."""
+        with Mdb(self._filepath) as mdb:
+            columns = None
+            if tblname in MapTables.MAPPING_COLNAMES:
+                used = (list(MapTables.MAPPING_COLNAMES[tblname])
+                    + MapTables.EXTRA_COLNAMES.get(tblname, []))
+                columns = [col for col in mdb.get_columnnames(tblname)
+                    if col.lower() in used]
+            table = mdb.get_table(tblname, columns=columns)
+        return MapTables._clean_table(tblname, table, self._filepath,
+            string_dtype=self._string_dtype)
 
 
 class MapTables:
@@ -115,12 +231,42 @@ class MapTables:
             },
         })
 
+    # columns used by MapTables that keep their original name
+    EXTRA_COLNAMES = {
+        'Element' : ['elmid','locatietype','datum','sbbtype','sbbtype1'],
+        }
+
+    # numeric identifiers that are used as strings
+    STRING_COLNAMES = {
+        'Element' : ['locatie_id','elmid'],
+        'KarteringVegetatietype' : ['locatie_id'],
+        'VegetatieType' : ['sbbcat_id','sbbcat2_id'],
+        'SbbType' : ['sbbcat_id','sbbcat_versie','sbbcat_vervangbaarheid'],
+        'KarteringSoort' : ['locatie_id','krtsrt_srtcode'],
+        'CbsSoort' : ['cbs_srtcode'],
+        'KarteringAbiotiek' : ['locatie_id'],
+        }
+
+    # data types for identifier columns in STRING_COLNAMES
+    STRING_DTYPES = {
+        'pyarrow' : 'string[pyarrow]',
+        'category' : 'category',
+        'object' : 'object',
+        }
+
+    # date columns and string format for dates in accessor tables
+    DATE_COLNAMES = {
+        'Element' : ['datum'],
+        'PuntLocatieSoort' : ['srtdatum'],
+        }
+    DATE_FORMAT = '%d%m%Y'
+
 
     def __init__(self, tables=None, filepath=None):
         """
         Parameters
         ----------
-        tables : OrderedDict
+        tables : OrderedDict | Mapping
             Dictionary of tables from mdb file.
         mdb : ReadMdb object, optional
             Original source with tables.
@@ -132,6 +278,9 @@ class MapTables:
         """
         self._tbldict = tables
         self._filepath = filepath
+        self._indexers = {}
+        self._datestrings = {}
+        self._yearcounts = None
 
     def __repr__(self):
         return f'MapTables (n={self.__len__()})'
@@ -144,7 +293,8 @@ class MapTables:
 
 
     @classmethod
-    def from_mdb(cls,filepath):
+    def from_mdb(cls, filepath, lazy=False, cache_dir=None,
+        string_dtype=None):
         """
         Create MapTables object from Microsoft Access mdb filepath."
 
@@ -152,11 +302,49 @@ class MapTables:
         ----------
         filepath : str
             valid filepath to Microsoft Access mdb file
+        lazy : bool, default False
+            Read each table on first access instead of reading all
+            tables at once. Only the columns used by MapTables are
+            read from tables in MAPPING_COLNAMES. The mdb file is
+            opened only while a table is read.
+        cache_dir : str, optional
+            Directory for cached tables. If given, cleaned tables are
+            stored in Parquet format on first read and read from cache
+            as long as the mdb file is unchanged. All tables are read
+            when tables are not yet in cache.
+        string_dtype : {'pyarrow','category','object'}, optional
+            Data type for identifier columns in STRING_COLNAMES, like
+            locatie_id and elmid. Default is 'pyarrow' (string[pyarrow])
+            when package pyarrow is installed, else 'object'.
 
         Returns
         -------
         MapTables 
+
+        Notes
+        -----
+        Identifier columns are used for joining tables. Storing them
+        as string[pyarrow] or category takes much less memory than
+        Python string objects.
         """
+        if string_dtype is None:
+            string_dtype = cls._default_string_dtype()
+        if string_dtype not in cls.STRING_DTYPES:
+            raise ValueError((f'Invalid string_dtype "{string_dtype}", '
+                f'valid values are {list(cls.STRING_DTYPES)}.'))
+
+        if cache_dir is not None and os.path.isfile(filepath):
+            cache = TableCache(cache_dir)
+            key = cache.key('maptables', [filepath])
+            tables = cache.get(key)
+            if tables is not None:
+                tables = {tblname:cls._cast_strings(tblname, table,
+                    string_dtype) for tblname, table in tables.items()}
+                return cls(tables=tables, filepath=filepath)
+            maptables = cls.from_mdb(filepath, string_dtype=string_dtype)
+            if maptables.is_valid:
+                cache.put(key, maptables._tbldict)
+            return maptables
 
         #try:
         mdb = Mdb(filepath)
@@ -166,52 +354,179 @@ class MapTables:
         
         ##expected = list(cls.MAPPING_COLNAMES.keys())
         if not 'Versie' in mdb.tablenames:
+            mdb.close()
             return cls(tables=None, filepath=filepath)
 
+        if lazy:
+            tablenames = mdb.tablenames
+            mdb.close()
+            return cls(tables=_MdbTables(filepath, tablenames,
+                string_dtype=string_dtype), filepath=filepath)
+
         # all mdb tables to dict
-        mdbtables = mdb.all_tables
+        with mdb:
+            mdbtables = mdb.all_tables
         maptables = {}
         for tblname in mdbtables.keys():
-            mdbtbl = mdbtables[tblname]
-            mdbtbl.columns = map(str.lower,mdbtbl.columns)
-            if tblname in cls.MAPPING_COLNAMES.keys():
-                mdbtbl = mdbtbl.rename(columns=cls.MAPPING_COLNAMES[tblname])
-            maptables[tblname] = mdbtbl
+            maptables[tblname] = cls._clean_table(tblname,
+                mdbtables[tblname], filepath, string_dtype=string_dtype)
+
+        return cls(tables=maptables, filepath=filepath)
+
+    @classmethod
+    def _clean_table(cls, tblname, mdbtbl, filepath, string_dtype='object'):
+        """Return mdb table with renamed columns and cleaned values."""
+        mdbtbl.columns = map(str.lower,mdbtbl.columns)
+        if tblname in cls.MAPPING_COLNAMES.keys():
+            mdbtbl = mdbtbl.rename(columns=cls.MAPPING_COLNAMES[tblname])
 
         # clean tables: numeric to string type
-        maptables['Element'] = maptables['Element'].astype(
-            {'locatie_id':str,'elmid':str,})
-        maptables['KarteringVegetatietype']=maptables['KarteringVegetatietype'].astype(
-            {'locatie_id':str,})
-        maptables['VegetatieType'] = maptables['VegetatieType'].astype(
-            {'sbbcat_id': str, 'sbbcat2_id': str,}) 
-        maptables['SbbType'] = maptables['SbbType'].astype(
-            {"sbbcat_id": str, "sbbcat_versie": str, "sbbcat_vervangbaarheid": str,}) 
-        maptables['KarteringSoort']=maptables['KarteringSoort'].astype(
-            {'locatie_id':str,'krtsrt_srtcode':str,})
-        maptables['CbsSoort']=maptables['CbsSoort'].astype(
-            {'cbs_srtcode':str,})
-        maptables['KarteringAbiotiek']=maptables['KarteringAbiotiek'].astype(
-            {'locatie_id':str,})
+        colnames = [col for col in cls.STRING_COLNAMES.get(tblname, [])
+            if col in mdbtbl.columns]
+        mdbtbl = mdbtbl.astype({col:str for col in colnames})
+
+        # clean tables: dates to datetime
+        for colname in cls.DATE_COLNAMES.get(tblname, []):
+            if colname in mdbtbl.columns:
+                mdbtbl[colname] = normalize_dates(mdbtbl[colname])
 
         # clean tables : change vevangbaarheid 5.0 to 5 stingtype
-        maptables['SbbType']['sbbcat_vervangbaarheid']=maptables['SbbType']['sbbcat_vervangbaarheid'].str[:1]
+        if tblname=='SbbType':
+            mdbtbl['sbbcat_vervangbaarheid']=mdbtbl['sbbcat_vervangbaarheid'].str[:1]
+
+        if tblname=='Element':
+
+            # clean tables : convert column locatietype to lowercase
+            # (locatietype can be: 'v','l','V','L')
+            mdbtbl['locatietype'] = mdbtbl['locatietype'].str.lower()
+
+            # fix small errors that occur in just a few (or just one) mdbfiles
+            # smallfix01
+            colnames = mdbtbl.columns
+            if ((not 'sbbtype' in colnames) and ('sbbtype1' in colnames)):
+                mdbtbl = mdbtbl.rename(columns={'sbbtype1':'sbbtype'})
+                logger.warning((f'Microsoft Access mdb file {filepath} '
+                    f'has invalid column name "sbbtype1". Renamed to abbtype.'))
+
+        return cls._cast_strings(tblname, mdbtbl, string_dtype)
+
+    @staticmethod
+    def _default_string_dtype():
+        """Return 'pyarrow' if package pyarrow is installed, else
+        'object'."""
+        try:
+            import pyarrow
+        except ImportError:
+            return 'object'
+        return 'pyarrow'
 
-        # clean tables : convert column locatietype to lowercase
-        # (locatietype can be: 'v','l','V','L')
-        maptables['Element']['locatietype'] = maptables['Element']['locatietype'].str.lower()
+    @classmethod
+    def _cast_strings(cls, tblname, table, string_dtype):
+        """Return table with identifier columns cast to string_dtype."""
+        dtype = cls.STRING_DTYPES[string_dtype]
+        colnames = [col for col in cls.STRING_COLNAMES.get(tblname, [])
+            if col in table.columns and table[col].dtype!=dtype]
+        if not colnames:
+            return table
+        return table.astype({col:dtype for col in colnames})
 
-        # fix small errors that occur in just a few (or just one) mdbfiles
-        # smallfix01
-        colnames = maptables['Element'].columns
-        if ((not 'sbbtype' in colnames) and ('sbbtype1' in colnames)):
-            maptables['Element']=maptables['Element'].rename(
-                columns={'sbbtype1':'sbbtype'})
-            logger.warning((f'Microsoft Access mdb file {filepath} '
-                f'has invalid column name "sbbtype1". Renamed to abbtype.'))
 
-        return cls(tables=maptables, filepath=filepath)
+    def _get_indexer(self, left, right, left_on, right_on=None,
+        validate=None, where=None):
+        """Return positions of rows in left and right table for a left
+        join of two tables.
 
+        Parameters
+        ----------
+        left : str
+            Name of left table.
+        right : str
+            Name of right table.
+        left_on : str
+            Name of key column in left table.
+        right_on : str, optional
+            Name of key column in right table, if different from
+            left_on.
+        validate : {'one_to_many','many_to_one'}, optional
+            Check uniqueness of keys.
+        where : tuple, optional
+            Tuple of column name and value. Only rows of right table
+            with this value are joined.
+
+        Notes
+        -----
+        Indexers are computed once and reused, accessor methods only
+        take rows by position.
+        """
+        if right_on is None:
+            right_on = left_on
+        key = (left, right, left_on, right_on, validate, where)
+        if key not in self._indexers:
+            leftkeys = self._tbldict[left][left_on]
+            rightkeys = self._tbldict[right][right_on]
+            if where is not None:
+                colname, value = where
+                selected = np.flatnonzero(
+                    self._tbldict[right][colname].to_numpy()==value)
+                rightkeys = rightkeys.iloc[selected]
+            lidx, ridx = _join_indexer(leftkeys, rightkeys,
+                validate=validate)
+            if where is not None:
+                ridx = np.where(ridx>=0, selected[np.maximum(ridx, 0)], -1)
+            self._indexers[key] = lidx, ridx
+        return self._indexers[key]
+
+    def _join_positions(self, positions, tblname, indexer):
+        """Return list of row positions extended with positions of
+        rows in the next table of a join.
+
+        Parameters
+        ----------
+        positions : list of np.ndarray
+            Row positions of joined tables, last array refers to table
+            tblname.
+        tblname : str
+            Name of left table of indexer.
+        indexer : tuple of np.ndarray
+            Positions as returned by _get_indexer().
+        """
+        lidx, ridx = indexer
+        counts = np.bincount(lidx, minlength=len(self._tbldict[tblname]))
+        starts = np.cumsum(counts) - counts
+
+        # position -1 selects an appended count of zero
+        current = positions[-1]
+        rows, nextpos = _expand(np.append(counts, 0)[current],
+            np.append(starts, 0)[current], ridx)
+        return [pos[rows] for pos in positions] + [nextpos]
+
+    def _get_datestrings(self, tblname, colname):
+        """Return array of formatted dates for date column, computed
+        once and reused."""
+        key = (tblname, colname)
+        if key not in self._datestrings:
+            self._datestrings[key] = format_dates(
+                self._tbldict[tblname][colname],
+                fmt=self.DATE_FORMAT).to_numpy()
+        return self._datestrings[key]
+
+    def _joined_table(self, parts):
+        """Return table with columns taken from joined tables.
+
+        Parameters
+        ----------
+        parts : list of tuple
+            Tuples of (table name, row positions, column names, suffix).
+            Column names already present get the suffix, like the
+            suffix for the right table in pd.merge().
+        """
+        data = {}
+        for tblname, positions, colnames, suffix in parts:
+            table = self._tbldict[tblname]
+            for colname in colnames:
+                name = colname if colname not in data else f'{colname}{suffix}'
+                data[name] = _take(table[colname], positions)
+        return DataFrame(data)
 
     @property
     def is_valid(self):
@@ -247,35 +562,39 @@ class MapTables:
                 f'Elements of loctyp "v" will be returned.'))
             loctype = 'v'
 
-        elmcolnames = ['locatie_id', 'elmid', 'locatietype', 'datum']
-        element = self._tbldict['Element'][elmcolnames]
-        isloctype = element['locatietype']==loctype
-        element = element[isloctype].copy()
+        isloctype = (self._tbldict['Element']['locatietype']==loctype
+            ).to_numpy()
+        elm, vegloc = self._get_indexer('Element',
+            'KarteringVegetatietype', 'locatie_id', validate='one_to_many')
+        keep = isloctype[elm]
+        positions = [elm[keep], vegloc[keep]]
 
-        vegloc = self._tbldict['KarteringVegetatietype']
-        element = pd.merge(element,vegloc,how='left',left_on='locatie_id',
-            right_on='locatie_id',suffixes=(None,'_vegloc'),
-            validate='one_to_many')
-
-        vegtype = self._tbldict['VegetatieType']
-        element = pd.merge(element,vegtype,how='left',left_on='vegtype_code',
-            right_on='vegtype_code',suffixes=(None,'_vegtype'),
-            validate='many_to_one')
-
-        sbbtype = self._tbldict['SbbType']
-        element = pd.merge(element,sbbtype,how='left',left_on='sbbcat_id',
-            right_on='sbbcat_id',suffixes=(None,'sbbtype'),
-            validate='many_to_one')
-
-        element['datum'] = element['datum'].apply(lambda x: x.strftime(
-            '%d%m%Y') if not pd.isna(x) else '')
+        positions = self._join_positions(positions, 'KarteringVegetatietype',
+            self._get_indexer('KarteringVegetatietype', 'VegetatieType',
+            'vegtype_code', validate='many_to_one'))
+        positions = self._join_positions(positions, 'VegetatieType',
+            self._get_indexer('VegetatieType', 'SbbType', 'sbbcat_id',
+            validate='many_to_one'))
 
         colnames = ['elmid','datum','locatietype','vegtype_code',
             'vegtype_naam','vegtype_vorm','vegtype_bedekkingcode',
             'vegtype_bedekkingnum',
             'sbbcat_code', 'sbbcat_wetnaam','sbbcat_nednaam',
             'sbbcat_kortenaam','sbbcat_vervangbaarheid']
-        element = element[colnames].copy()
+        # each column from the first table that has it
+        tblnames = ['Element','KarteringVegetatietype','VegetatieType',
+            'SbbType']
+        parts = [(tblname, pos, [], None) for tblname, pos
+            in zip(tblnames, positions)]
+        for colname in colnames:
+            part = next(part for part in parts
+                if colname in self._tbldict[part[0]].columns)
+            part[2].append(colname)
+        element = self._joined_table(parts)
+
+        element['datum'] = self._get_datestrings('Element', 'datum')[
+            positions[0]]
+        element = element[colnames]
 
         if select=='maxcov':
             element = element.sort_values(['elmid',
@@ -312,28 +631,29 @@ class MapTables:
                 f'Elements of loctyp "v" will be returned.'))
             loctype = 'v'
 
-        # table ElmID
-        elmcols = ['elmid', 'locatietype', 'datum','vegtype_combi_code',]
+        # elements with combined legend and legend description
+        isloctype = (self._tbldict['Element']['locatietype']==loctype
+            ).to_numpy()
+        elm, leg = self._get_indexer('Element', 'LegendaHulp',
+            'vegtype_combi_code', where=('karteer_item','vegetatie'))
+        keep = isloctype[elm]
+        positions = self._join_positions([elm[keep], leg[keep]],
+            'LegendaHulp', self._get_indexer('LegendaHulp',
+            'VereenvoudigdeLegenda', 'vegtype_eenvoudig_code'))
 
-        mask = self._tbldict['Element']['locatietype']==loctype
-        elmtbl = self._tbldict['Element'][mask][elmcols].copy()
-
-        # table with legend 
+        elmcols = ['elmid', 'locatietype', 'datum','vegtype_combi_code',]
         legcols = [
-            'vegtype_combi_code', 'vegtype_combi_naam',
+            'vegtype_combi_naam',
             'vegtype_eenvoudig_code','sbbcat_combi_code','sbbcat_combi_nednaam',
             'sbbcat_combi_wetnaam',]
-        mask = self._tbldict['LegendaHulp']['karteer_item']=='vegetatie'
-        legtbl = self._tbldict['LegendaHulp'][mask][legcols].copy()
-
-        # add description to legend table
-        legtbl = pd.merge(legtbl,self._tbldict['VereenvoudigdeLegenda'],
-            left_on='vegtype_eenvoudig_code',right_on='vegtype_eenvoudig_code',
-            how='left')
-
-        # merge Elments with combined legend
-        singlepoly = pd.merge(elmtbl,legtbl,left_on='vegtype_combi_code',
-            right_on='vegtype_combi_code',how='left')
+        simplecols = [col for col in
+            self._tbldict['VereenvoudigdeLegenda'].columns
+            if col!='vegtype_eenvoudig_code']
+        singlepoly = self._joined_table([
+            ('Element', positions[0], elmcols, None),
+            ('LegendaHulp', positions[1], legcols, '_y'),
+            ('VereenvoudigdeLegenda', positions[2], simplecols, '_y'),
+            ])
 
         return singlepoly
 
@@ -351,8 +671,8 @@ class MapTables:
 
         # create pointspecies export
         pntsrt = self._tbldict['PuntLocatieSoort'].copy()
-        pntsrt['srtdatum'] = pntsrt['srtdatum'].apply(
-            lambda x: x.strftime('%d%m%Y') if not pd.isna(x) else '')
+        pntsrt['srtdatum'] = self._get_datestrings('PuntLocatieSoort',
+            'srtdatum')
         return pntsrt
 
 
@@ -370,24 +690,28 @@ class MapTables:
         ------
         int | None
         """
-        year = None
-
         if not self.is_valid:
             return None
+        return self._select_year(self.yearcounts, preference=preference)
+
+    @staticmethod
+    def _select_year(yearcounts, preference='count'):
+        """Return single year from number of mapped elements by year."""
+        year = None
 
-        if self.yearcounts.empty: #no valid years found
+        if yearcounts.empty: #no valid years found
             return None
 
-        if len(self.yearcounts)==1: #exactly one valid year found
-            return int(self.yearcounts.index[0])
+        if len(yearcounts)==1: #exactly one valid year found
+            return int(yearcounts.index[0])
 
         if preference=='count':
-            year = self.yearcounts.idxmax()
+            year = yearcounts.idxmax()
 
         # if multiple mapping years are present, return last or first 
         # year, but only if no years in between are missing.
         if preference in ['first','last']:
-            years = self.yearcounts.index.to_list()
+            years = yearcounts.index.to_list()
             years_subsequent = [(years[i]-years[i-1])==1 for i in range(1,len(years))]
             if np.all(years_subsequent)==1:
                 if preference=='last':
@@ -400,6 +724,47 @@ class MapTables:
 
         return year
 
+    @classmethod
+    def peek_mapyear(cls, filepath, preference='count', cache_dir=None):
+        """Return single year of mapping without reading map tables.
+
+        Parameters
+        ----------
+        filepath : str
+            Valid filepath to Microsoft Access mdb file.
+        preference : {'count','first','last'}, default 'count'
+            Criterium to choose one mapping year, as for get_mapyear.
+        cache_dir : str, optional
+            Directory for cached tables. If the mdb file is in cache,
+            dates are read from cache.
+
+        Return
+        ------
+        int | None
+
+        Notes
+        -----
+        Only column datum of table Element is read, from the cache or
+        from the mdb file.
+        """
+        dates = None
+        if cache_dir is not None and os.path.isfile(filepath):
+            cache = TableCache(cache_dir)
+            dates = cache.get_table(cache.key('maptables', [filepath]),
+                'Element', columns=['datum'])
+
+        if dates is None:
+            with Mdb(filepath) as mdb:
+                if not 'Versie' in mdb.tablenames:
+                    return None
+                columns = [col for col in mdb.get_columnnames('Element')
+                    if col.lower()=='datum']
+                dates = mdb.get_table('Element', columns=columns)
+            dates.columns = map(str.lower, dates.columns)
+
+        yearcounts = cls._count_years(dates['datum'], filepath)
+        return cls._select_year(yearcounts, preference=preference)
+
     @property
     def empty(self):
         if self._tbldict is None:
@@ -409,13 +774,21 @@ class MapTables:
     @property
     def yearcounts(self):
         """Return number of mapped elements by year."""
-        dates = pd.to_datetime(self._tbldict['Element']['datum'],errors='coerce')
+        if self._yearcounts is None:
+            self._yearcounts = self._count_years(
+                self._tbldict['Element']['datum'], self._filepath)
+        return self._yearcounts.copy()
+
+    @staticmethod
+    def _count_years(dates, filepath=None):
+        """Return number of dates by year."""
+        dates = normalize_dates(dates)
         years = dates.dt.year.value_counts()
         years.name = 'elements'
         years.index.name = 'jaar'
 
         if years.empty:
-            warnings.warn((f'No valid dates in {self._filepath}.'),stacklevel=1)
+            warnings.warn((f'No valid dates in {filepath}.'),stacklevel=1)
 
         return years.sort_index()
     
@@ -441,21 +814,23 @@ class MapTables:
         if loctype not in ['all','v','l']:
             raise ValueError(f'Invalid loctype {loctype}')
 
-        elmcolnames = ['locatie_id', 'elmid', 'locatietype', 'datum','sbbtype']
-        element = self._tbldict['Element'][elmcolnames]
+        # right join of elements on species is a left join of species
+        # on elements
+        srt, elm = self._get_indexer('KarteringSoort', 'Element',
+            'locatie_id', validate='many_to_one')
+        srt, cbs = self._get_indexer('KarteringSoort', 'CbsSoort',
+            'krtsrt_srtcode', 'cbs_srtcode', validate='many_to_one')
 
-        krtsrt = self._tbldict['KarteringSoort']
-        mapspec = pd.merge(element,krtsrt,left_on='locatie_id',
-            right_on='locatie_id',how='right',suffixes=(None,'_krtsrt'),
-            validate='one_to_many')
+        elmcolnames = ['elmid', 'locatietype', 'datum','sbbtype']
+        srtcolnames = [col for col in self._tbldict['KarteringSoort'].columns
+            if col!='locatie_id']
+        cbscolnames = ['cbs_srtwet','cbs_srtned',]
+        mapspec = self._joined_table([
+            ('Element', elm, elmcolnames, None),
+            ('KarteringSoort', srt, srtcolnames, '_krtsrt'),
+            ('CbsSoort', cbs, cbscolnames, '_cbs'),
+            ])
 
-        cbscolnames = ['cbs_srtcode','cbs_srtwet','cbs_srtned',]
-        cbs = self._tbldict['CbsSoort'][cbscolnames]
-        mapspec = pd.merge(mapspec,cbs,left_on='krtsrt_srtcode',
-            right_on='cbs_srtcode',how='left',suffixes=(None,'_cbs'),
-            validate='many_to_one')
-
-        mapspec = mapspec.drop(columns=['locatie_id','cbs_srtcode'])
 
         if loctype in ['v','l']:
             mapspec = mapspec[mapspec['locatietype']==loctype]
@@ -478,22 +853,26 @@ class MapTables:
         if loctype not in ['all','v','l']:
             raise ValueError(f'Invalid loctype {loctype}')
 
-        elmcolnames = ['locatie_id', 'elmid', 'locatietype', 'datum']
-        element = self._tbldict['Element'][elmcolnames]
-        abi = self._tbldict['KarteringAbiotiek']
-        mapabi = pd.merge(element,abi,left_on='locatie_id',
-            right_on='locatie_id',how='left',suffixes=(None,'_abi'),
-            validate='one_to_many')
-
-        abicode = self._tbldict['Abiotiek']
-        mapabi = pd.merge(mapabi,abicode,left_on='abio_code',
-            right_on='abio_code',how='left',suffixes=(None,'_abicode'),
-            validate='many_to_one')
+        elm, abi = self._get_indexer('Element', 'KarteringAbiotiek',
+            'locatie_id', validate='one_to_many')
+        positions = self._join_positions([elm, abi], 'KarteringAbiotiek',
+            self._get_indexer('KarteringAbiotiek', 'Abiotiek', 'abio_code',
+            validate='many_to_one'))
+
+        elmcolnames = ['elmid', 'locatietype', 'datum']
+        abicolnames = [col for col in
+            self._tbldict['KarteringAbiotiek'].columns if col!='locatie_id']
+        codecolnames = [col for col in self._tbldict['Abiotiek'].columns
+            if col!='abio_code']
+        mapabi = self._joined_table([
+            ('Element', positions[0], elmcolnames, None),
+            ('KarteringAbiotiek', positions[1], abicolnames, '_abi'),
+            ('Abiotiek', positions[2], codecolnames, '_abicode'),
+            ])
 
         if loctype in ['v','l']:
             mapabi = mapabi[mapabi['locatietype']==loctype]
 
-        mapabi = mapabi.drop(columns=['locatie_id'])
         return mapabi[mapabi['abio_code'].notnull()]
 
 
@@ -1,10 +1,19 @@
 
 import os
 import collections
+import datetime
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 ##import warnings
 from pandas import Series, DataFrame
+import numpy as np
 import pandas as pd
-import pyodbc
+try:
+    import pyodbc
+except ImportError:
+    pyodbc = None
+
+from ._jet import JetFile
 
 from logging import getLogger
 logger = getLogger(__name__)
@@ -22,11 +31,25 @@ class Mdb:
         Return specific table as pd.DataFrame
     all_tables
         Return all tables as OrderedDict of Dataframes
+    close
+        Close connection to mdb file
+    open_many
+        Read tables from many mdb files
+
+    Notes
+    -----
+    Mdb can be used as context manager, the connection is closed on
+    exit:
+
+    with Mdb(mdbpath) as mdb:
+        element = mdb.get_table('Element')
     """
 
     ##_mdbopen_errors = []
 
-    def __init__(self, mdbpath):
+    BACKENDS = ['odbc','jet']
+
+    def __init__(self, mdbpath, backend=None):
         """
         Open Microsoft Access mdb-file
 
@@ -34,6 +57,15 @@ class Mdb:
         ----------
         mdbpath : str
             valid filepath to .mdb file
+        backend : {'odbc','jet'}, optional
+            Read mdb file with the Microsoft Access ODBC driver (odbc)
+            or read database pages directly from file (jet). Default
+            is odbc when pyodbc is installed, else jet.
+
+        Notes
+        -----
+        The jet backend does not need an ODBC driver and can be used
+        on systems without Microsoft Access drivers.
     `   """
 
         if not mdbpath:
@@ -42,9 +74,24 @@ class Mdb:
         if not os.path.isfile(mdbpath):
             raise TypeError(f'{mdbpath} is not a valid filepath.')
 
+        if backend is None:
+            backend = 'jet' if pyodbc is None else 'odbc'
+        if backend not in self.BACKENDS:
+            raise ValueError((f'Invalid backend "{backend}", valid '
+                f'backends are {self.BACKENDS}.'))
+        if backend=='odbc' and pyodbc is None:
+            raise ValueError(f'Backend "odbc" requires package pyodbc.')
+        self._backend = backend
+
         # connect to mdb file
         self._mdbpath = mdbpath
-        self._cur = self._connect()
+        self._jet = None
+        self._conn = None
+        self._cur = None
+        if self._backend=='jet':
+            self._jet = self._open_jet()
+        else:
+            self._cur = self._connect()
 
     def __repr__(self):
         """Return string representation of Mdb instance."""
@@ -57,6 +104,31 @@ class Mdb:
         """Return number of tables."""
         return len(self.tablenames)
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close connection to mdb file. Tables can not be read after
+        closing."""
+        if self._cur is not None:
+            self._cur.close()
+            self._cur = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._jet is not None:
+            self._jet.close()
+            self._jet = None
+
+    @property
+    def closed(self):
+        """Return True if connection to mdb file is closed or could
+        not be opened."""
+        return self._cur is None and self._jet is None
+
     def _connect(self):
 
         self._mdbopen_error = None
@@ -89,9 +161,33 @@ class Mdb:
                 self._cur.close()
             if self._conn is not None:
                 self._conn.close()
+            self._cur = None
+            self._conn = None
 
         return self._cur
 
+    def _open_jet(self):
+        """Return JetFile object, returns None if file could not be
+        read."""
+        self._mdbopen_error = None
+        jet = None
+        try:
+            jet = JetFile(self._mdbpath)
+            jet.tablenames # read table names to validate file
+        except Exception as err:
+            if jet is not None:
+                jet.close()
+            self._mdbopen_error = {
+                'errtype':err.__class__,
+                'errmsg':repr(err),
+                'fpath':self._mdbpath,
+                }
+            logger.warning((f'Could not open .mdb file {self._mdbpath} '
+             f'because of an {self._mdbopen_error["errtype"]} error. '
+             f'Full error message: {self._mdbopen_error["errmsg"]}.'))
+            return None
+        return jet
+
     def _cursor(self):
         """Return cursor, returns None if file could not be opened"""
         return self._cur
@@ -108,23 +204,108 @@ class Mdb:
     def tablenames(self):
         """Return list of tablenames in database"""
         tblnames = []
+        if self._jet is not None:
+            tblnames = self._jet.tablenames
         if self._cur is not None:
             for table_info in self._cur.tables(tableType='TABLE'):
                 tblnames.append(table_info.table_name)
         return tblnames
 
-    def get_table(self,tblname):
-        """Return specified table as pd.DataFrame"""
-        qrstr = f'select * from [{tblname}]'
+    def get_columnnames(self, tblname):
+        """Return list of column names in table."""
+        if self._jet is not None:
+            return [column.name for column in self._jet.get_columns(tblname)]
+        return [column.column_name for column
+            in self._cur.columns(table=tblname)]
+
+    def get_table(self, tblname, columns=None, where=None,
+        batchsize=10000):
+        """Return specified table as pd.DataFrame
+
+        Parameters
+        ----------
+        tblname : str
+            Name of table in database.
+        columns : list, optional
+            Names of columns to select. All columns are returned if
+            not given.
+        where : str, optional
+            SQL condition to select rows, for example "Jaar>2000".
+            Only supported by the odbc backend.
+        batchsize : int, default 10000
+            Number of rows fetched from the database at once.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        if self._jet is not None:
+            colnames, coltypes, batches = self._fetch_jet(tblname,
+                columns=columns, where=where, batchsize=batchsize)
+        else:
+            colnames, coltypes, batches = self._fetch_odbc(tblname,
+                columns=columns, where=where, batchsize=batchsize)
+
+        # append rows to column buffers batch by batch
+        buffers = [[] for col in colnames]
+        for rows in batches:
+            for buffer, values in zip(buffers, zip(*rows)):
+                buffer.extend(values)
+
+        table = DataFrame({colname:self._column_array(buffer, coltype)
+            for colname, buffer, coltype in zip(colnames, buffers, coltypes)},
+            columns=colnames)
+        return table
+
+    def _fetch_odbc(self, tblname, columns=None, where=None,
+        batchsize=10000):
+        """Return column names, column types and iterator of row
+        batches from odbc cursor."""
+        colstr = '*'
+        if columns is not None:
+            colstr = ','.join([f'[{col}]' for col in columns])
+        qrstr = f'select {colstr} from [{tblname}]'
+        if where is not None:
+            qrstr = f'{qrstr} where {where}'
         self._cur.execute(qrstr)
         colnames = [column[0] for column in self._cur.description]
+        coltypes = [column[1] for column in self._cur.description]
+        batches = iter(lambda: self._cur.fetchmany(batchsize), [])
+        return colnames, coltypes, batches
 
-        data = []
-        for row in self._cur.fetchall():
-            data.append(list(row))
+    def _fetch_jet(self, tblname, columns=None, where=None,
+        batchsize=10000):
+        """Return column names, column types and iterator of row
+        batches from jet database pages."""
+        if where is not None:
+            raise ValueError('Argument where is not supported by backend jet.')
+        tblcols = self._jet.get_columns(tblname)
+        if columns is not None:
+            colnames = {col.name.lower():col for col in tblcols}
+            tblcols = [colnames[col.lower()] for col in columns]
+        rows = self._jet.iter_rows(tblname,
+            columns=[col.name for col in tblcols])
+        batches = iter(lambda: list(itertools.islice(rows, batchsize)), [])
+        return ([col.name for col in tblcols], [col.pytype for col in tblcols],
+            batches)
 
-        table = DataFrame(data, columns=colnames)
-        return table
+    @staticmethod
+    def _column_array(values, coltype):
+        """Return array of values typed by column type from cursor
+        description."""
+        if coltype is float:
+            return np.array(values, dtype='float64')
+        if coltype is int:
+            if None in values:
+                return np.array(values, dtype='float64')
+            return np.array(values, dtype='int64')
+        if coltype is bool and None not in values:
+            return np.array(values, dtype='bool')
+        if coltype is datetime.datetime:
+            return pd.Series(values)
+        array = np.empty(len(values), dtype='object')
+        array[:] = values
+        return array
 
     @property
     def all_tables(self):
@@ -140,4 +321,58 @@ class Mdb:
         """Return path to mdb sourcefile."""
         return self._mdbpath
 
+    @classmethod
+    def open_many(cls, paths, tables=None, max_open=8, backend=None):
+        """Read tables from many mdb files in threads.
+
+        Parameters
+        ----------
+        paths : list
+            Filepaths to mdb files.
+        tables : list, optional
+            Names of tables to read from each file. All tables are read
+            if not given. Tables missing from a file are skipped.
+        max_open : int, default 8
+            Maximum number of mdb files that are open at the same time.
+        backend : {'odbc','jet'}, optional
+            Backend for reading mdb files, as for Mdb.
+
+        Returns
+        -------
+        tuple of (dict, pd.DataFrame)
+            Dictionary of filepath and OrderedDict of tables, and a
+            table of files that could not be read.
+
+        Notes
+        -----
+        Each file is opened, read and closed by one of max_open
+        threads, so no more than max_open connections are open.
+        """
+        def read_tables(path):
+            try:
+                with cls(path, backend=backend) as mdb:
+                    if mdb.read_error is not None:
+                        return None, mdb.read_error
+                    if tables is None:
+                        return mdb.all_tables, None
+                    tblnames = mdb.tablenames
+                    return collections.OrderedDict(
+                        (name, mdb.get_table(name)) for name in tables
+                        if name in tblnames), None
+            except Exception as err:
+                return None, {'errtype':err.__class__, 'errmsg':repr(err),
+                    'fpath':path}
+
+        with ThreadPoolExecutor(max_workers=max_open) as executor:
+            results = list(executor.map(read_tables, paths))
+
+        mdbtables, errors = {}, []
+        for path, (tbldict, error) in zip(paths, results):
+            if error is not None:
+                errors.append(error)
+                continue
+            mdbtables[path] = tbldict
+        errors = DataFrame(errors, columns=['fpath','errtype','errmsg'])
+        return mdbtables, errors
+
 
@@ -8,17 +8,36 @@ fixed as much as possible.
 """
 
 import os, sys, stat
+from contextlib import contextmanager
 import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
+import pyogrio
 import fiona
 import json
 #import warnings
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from ._georepair import polygons_from_coordinates, repair_geometries
 
 from logging import getLogger
 logger = getLogger(__name__)
 
 
+@contextmanager
+def _restore_shx():
+    """Rebuild missing .shx index files while reading with pyogrio."""
+    pyogrio.set_gdal_config_options({'SHAPE_RESTORE_SHX':True})
+    try:
+        yield
+    finally:
+        pyogrio.set_gdal_config_options({'SHAPE_RESTORE_SHX':None})
+
+
 class ShapeFile:
     """
     Open ESRI shapefile as GeoPandas object
@@ -36,12 +55,17 @@ class ShapeFile:
     _empty_error = {'class':None,'msg':None,'fpath':None}
     _bad_polygons = []
 
-    def __init__(self, fpath):
+    ERROR_COLUMNS = ['fid','error','solution']
+
+    def __init__(self, fpath, repair=False):
         """
         Parameters
         ----------
         fpath : str
             filepath to ESRI shapefile
+        repair : bool, default False
+            Repair invalid geometries of all features, see function
+            repair_geometries.
 
         Notes
         -----
@@ -55,11 +79,12 @@ class ShapeFile:
         self._fname = os.path.basename(self._fpath)
 
         # empty dataframe for shape errors
-        columns = ['fid','error','solution']
-        self._shperr = pd.DataFrame(columns=columns)
+        self._shperr = pd.DataFrame(columns=self.ERROR_COLUMNS)
 
         # read shapefile
         self._shape, self._shperr = self._readfile(self._fpath, self._shperr)
+        if repair and not self._shape.empty:
+            self._shape, self._shperr = self._repair(self._shape, self._shperr)
 
         if not self._shape.empty:
             self._shape.columns = map(str.lower,self._shape.columns)
@@ -79,10 +104,15 @@ class ShapeFile:
                 logger.warning((f'File permisson "read-only" has been set to '
                     f'"write" on shapefile index {shxpath}.'))
 
-        # read shapefile with geopandas
+        # read shapefile with geopandas, using pyogrio with arrow
         try:
-            gdf = gpd.read_file(fpath)
-            gdf.index.name = 'fid' # geopandas sets shapefile fid as index
+            kwargs = {}
+            if pyarrow is not None:
+                kwargs = {'use_arrow':True,
+                    'arrow_to_pandas_kwargs':{'date_as_object':False}}
+            gdf = gpd.read_file(fpath, engine='pyogrio', fid_as_index=True,
+                **kwargs)
+            gdf.index.name = 'fid'
 
         except Exception as e:
 
@@ -92,10 +122,10 @@ class ShapeFile:
                 'fpath':fpath,
                 }
 
-            # try to fix geometry errors with fiona
+            # try to fix geometry errors
             try:
                 gdf, shperr = self.read_with_fiona(fpath, shperr)
-            except ValueError as a:
+            except Exception as a:
                 logger.error((f'Shapefile contains topological errors '
                     f'and can not be read, empty geodataframe will be '
                     f' returned: {fpath}'))
@@ -107,22 +137,35 @@ class ShapeFile:
             # remove rows with None type geometries (GeoPandas does not 
             # check for this when reading a shapefile, but it's method 
             # geom.type will fail)
-            geom_null = gdf[gdf.geom_type.isnull()]
-            if not geom_null.empty:
-                logger.warning((f'Deleted {len(geom_null)} rows without '
+            isnull = gdf.geometry.isna().to_numpy()
+            if isnull.any():
+                logger.warning((f'Deleted {isnull.sum()} rows without '
                     f'valid geometry in {self._fpath}.'))
-                for fid,row in geom_null.iterrows():
-                    idx = len(shperr)
-                    shperr.loc[idx,'fid'] = fid
-                    shperr.loc[idx,'error'] = f'Geometry type is None'
-                    shperr.loc[idx,'solution'] =f'Dropped record with fid={fid}'
-                gdf = gdf[gdf.geom_type.notnull()].copy()
+                errors = [self._null_error(fid) for fid in gdf.index[isnull]]
+                shperr = self._append_errors(shperr, errors)
+                gdf = gdf[~isnull].copy()
 
         if gdf.empty:
             logger.warning((f'Shapefile contents can not be read: {self._fpath}.'))
 
         return gdf, shperr
 
+    @staticmethod
+    def _null_error(fid):
+        """Return error for feature without geometry."""
+        return {'fid':fid, 'error':'Geometry type is None',
+            'solution':f'Dropped record with fid={fid}'}
+
+    @classmethod
+    def _append_errors(cls, shperr, errors):
+        """Return table of shape errors with list of errors appended."""
+        if not errors:
+            return shperr
+        errors = pd.DataFrame(errors, columns=cls.ERROR_COLUMNS)
+        if shperr.empty:
+            return errors
+        return pd.concat([shperr, errors], ignore_index=True)
+
     def read_with_fiona(self,fpath,shperr=None):
         """Read shapefile with errors and return GeoPandas dataframe.
 
@@ -140,70 +183,81 @@ class ShapeFile:
         -----
         This function is used internally, but it can be used with any 
         filepath without changes the status of the ShapeFile object. 
-        Reading is done with fiona instead of geopandas and some errors 
-        are fixed automatically and user warnings of changes are issued.
+        All features are read at once with pyogrio and geometries are
+        validated as array. Only features with geometries that can not
+        be read are read again with fiona, polygon rings with less
+        than three nodes are dropped from these features with function
+        polygons_from_coordinates. Missing .shx index files are
+        rebuild.
         """
         if shperr is None:
             shperr = self._shperr.copy()
 
-        # open shapefile with fiona
-        # .shx index files are automatically rebuild
-        # by temprarily changing GDAL standard setting:
-        with fiona.Env(SHAPE_RESTORE_SHX='YES'):
-            self._fiona = fiona.open(fpath)
-
-        # validate shape items one by one and copy valid items
-        reclist = []
-        for key in self._fiona.keys():
-
-            # copy feature from fiona to dict
-            feature = self._fiona.get(key)
-
-            # error: Geometry is None
-            if feature['geometry'] is None:
-                idx = len(shperr)
-                shperr.loc[idx,'fid'] = feature["id"]
-                shperr.loc[idx,'error'] = f'Geometry type is None'
-                shperr.loc[idx,'solution'] = f'Dropped record with fid={feature["id"]}'
-                continue # simply ignore this feature
-
-            # error: polygon field contains rings with less than three nodes
-            if feature['geometry']['type']=='Polygon':
-                newcoords = []
-                badrings = 0
-                for ring in feature['geometry']['coordinates']:
-                    if len(ring)<3:
-                        badrings+=1
-                    else:
-                        newcoords.append(ring)
-
-                if badrings!=0:
-                    
-                    idx = len(shperr)
-                    shperr.loc[idx,'fid'] = feature['id']
-                    shperr.loc[idx,'error'] = f'Found {str(badrings)} polygon rings with less than three nodes.'
-                    shperr.loc[idx,'solution'] = f'Dropped {str(badrings)} invalid polygon rings with less than three nodes'
-        
-                feature['geometry']['coordinates']=newcoords
-
-            # append validated feature to reclist
-            reclist.append(feature)
-        
-        # create GeoDataFrame from list of fiona features
-        if self._fiona.crs.is_valid:
-            crs = self._fiona.crs
-        else:
-            crs = shp._fiona.crs.from_epsg(28992) # dutch grid
-        gdf = gpd.GeoDataFrame.from_features([feature for feature in reclist], crs=crs)
-
-        # tidy up geodataframe
-        columns = list(self._fiona.schema["properties"]) + ["geometry"]
-        for col in columns:
-            if col not in gdf.columns: # fiona drops columns with only nans?
-                gdf[col] = np.nan
-        gdf = gdf[columns]  
-        gdf.index.name = 'fid' #geopandas sets shapefile fid as index
-
+        with _restore_shx():
+            meta, fids, wkb, field_data = pyogrio.raw.read(fpath,
+                return_fids=True)
+        geometries = shapely.from_wkb(wkb, on_invalid='ignore')
+
+        # error: Geometry is None
+        errors = []
+        isnull = pd.isna(wkb)
+        errors.extend(self._null_error(fid) for fid in fids[isnull])
+
+        # geometries that can not be read by shapely, like polygon
+        # rings with less than three nodes, are read with fiona and
+        # rebuild without these rings for all features at once
+        isbad = shapely.is_missing(geometries) & ~isnull
+        if isbad.any():
+            positions = np.flatnonzero(isbad)
+            with fiona.Env(SHAPE_RESTORE_SHX='YES'), fiona.open(fpath) as src:
+                features = [src.get(int(fids[pos])) for pos in positions]
+            geomtypes = [feature.geometry.type for feature in features]
+            coordinates = [feature.geometry.coordinates for feature in features]
+            geometries[positions], badrings = polygons_from_coordinates(
+                geomtypes, coordinates)
+            for pos, nrings in zip(positions, badrings):
+                if nrings!=0:
+                    errors.append(self._badrings_error(fids[pos], nrings))
+                elif shapely.is_missing(geometries[pos]):
+                    errors.append({'fid':fids[pos],
+                        'error':'Geometry can not be read',
+                        'solution':f'Dropped record with fid={fids[pos]}'})
+
+        # create GeoDataFrame from attributes and valid geometries
+        crs = meta['crs']
+        if crs is None:
+            crs = 'epsg:28992' # dutch grid
+        gdf = gpd.GeoDataFrame(dict(zip(meta['fields'], field_data)),
+            geometry=geometries, crs=crs, index=pd.Index(fids, name='fid'))
+        gdf = gdf[~isnull & ~shapely.is_missing(geometries)]
+
+        return gdf, self._append_errors(shperr, errors)
+
+    @staticmethod
+    def _badrings_error(fid, nrings):
+        """Return error for feature with polygon rings with less than
+        three nodes."""
+        return {'fid':fid,
+            'error':(f'Found {nrings} polygon rings with less '
+                f'than three nodes.'),
+            'solution':(f'Dropped {nrings} invalid polygon rings '
+                f'with less than three nodes'),
+            }
+
+    def _repair(self, gdf, shperr):
+        """Return GeoDataFrame with repaired geometries and shape errors
+        with repairs appended."""
+        geometries, report = repair_geometries(gdf.geometry.values,
+            fids=gdf.index.to_numpy())
+        if report.empty:
+            return gdf, shperr
+        logger.warning((f'Repaired {len(report)} geometries in '
+            f'{self._fpath}.'))
+        gdf = gdf.set_geometry(gpd.GeoSeries(geometries, index=gdf.index,
+            crs=gdf.crs))
+        gdf = gdf[~shapely.is_missing(geometries)]
+        shperr = self._append_errors(shperr,
+            report[self.ERROR_COLUMNS].to_dict('records'))
         return gdf, shperr
 
     @property
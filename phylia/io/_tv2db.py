@@ -4,12 +4,16 @@ from a folder with source files.
    
 """ 
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pandas import DataFrame, Series
 import pandas as pd
 from geopandas import GeoDataFrame
 import geopandas as gpd
 
+from ._dbf import DbfFile
+
 
 class Tv2Db:
     """Read Turboveg2 dataset with vegetation releve data from folder."""
@@ -55,6 +59,11 @@ class Tv2Db:
         'SHRUB_LOW': 'N','HERB_HIGH': 'N','HERB_LOW': 'N','HERB_MAX': 'N',
         'CRYPT_HIGH': 'N','MOSS_IDENT': 'C','LICH_IDENT': 'C','REMARKS': 'C',}
 
+    TVABUND_TYPES = {'RELEVE_NR':'N','SPECIES_NR':'N','COVER_CODE':'C',
+        'LAYER':'N',}
+
+    TVREMARKS_TYPES = {'RELEVE_NR':'N','REMARKS':'C',}
+
     SBB_TYPES = {'AUTEURNAAM':'C','BED_OPENWA':'N','BLOK':'C','BUREAU':'C',
         'DEELGEBIED':'C','KM_HOK_X':'C','KM_HOK_Y':'C','LENGTH':'N',
         'LOC_TYPE':'C','NEW_SYNTAX':'C','PQ':'C','SBBCODE':'C','SBBPRJCODE':'C',
@@ -89,7 +98,7 @@ class Tv2Db:
         '24':'Aq. terreinopn. schaal',
         }
 
-    def __init__(self, folder, prjname=None):
+    def __init__(self, folder, prjname=None, columns=None):
         """
         Parameters
         ----------
@@ -97,9 +106,19 @@ class Tv2Db:
             Valid path to folder with Tv2 files.
         prjname : str, optional
             User defined database project name.
+        columns : dict, optional
+            Dictionary of filename (without extension) and list of
+            columns to read from that file, for example
+            {'tvabund':['RELEVE_NR','SPECIES_NR','COVER_CODE','LAYER']}.
+            Requested columns that are not in the file are ignored.
+            All columns are read from files not in columns.
 
         Notes
         -----
+        Dbf files are memory-mapped and only requested columns are
+        decoded, so reading a subset of columns from a large tvabund.dbf
+        file takes little memory.
+
         In Turboveg2 stores releve data in a folder with several files:
             - tvhabita.dbf with header data.
             - tvabund.dbf with species abundance data.
@@ -119,10 +138,18 @@ class Tv2Db:
         self._tvadmin = DataFrame(columns=self.TVADMIN_COLS)
         self._tvwin = DataFrame(columns=self.TVWIN_COLS)
         self._tvwinset = None
+
+        # sorted tables are computed on first access and recomputed
+        # only when the source table is replaced
+        self._tvhabita_cache = None
+        self._tvabund_cache = None
+
         self._flora = None
         self._map = None
         self._dictionary = None
         self.prjname = prjname
+        if columns is None:
+            columns = {}
 
         # check path to source directory
         if not Path(folder).exists():
@@ -139,24 +166,27 @@ class Tv2Db:
             if not fpath.is_file():
                 continue
 
-            gdf = gpd.read_file(fpath, engine='fiona')
-            #table = DataFrame(gdf.drop(columns=['geometry']))
-            table = gdf.copy()
+            dbf = DbfFile(fpath)
+            usecols = columns.get(filename)
+            if usecols is not None:
+                usecols = [col for col in usecols if col in dbf.columns]
+            table = dbf.to_frame(columns=usecols,
+                fieldtypes=self._fieldtypes(filename))
 
             if filename=='tvhabita':
-                self._tvhabita = table.copy()
+                self._tvhabita = table
 
             if filename=='tvabund':
-                self._tvabund = table.copy()
+                self._tvabund = table
 
             if filename=='remarks':
-                self._remarks = table.copy()
+                self._remarks = table
 
             if filename=='tvadmin':
-                self._tvadmin = table.copy()
+                self._tvadmin = table
 
             if filename=='tvwin':
-                self._tvwin = table.copy()
+                self._tvwin = table
                 if not self._tvwin.empty:
                     self._flora = self._tvwin.loc[0,'FLORA']
                     self._map = self._tvwin.loc[0,'MAP']
@@ -182,6 +212,16 @@ class Tv2Db:
                 self._dictionary = tvwin_list[-1]
 
 
+    def _fieldtypes(self, filename):
+        """Return dictionary of Turboveg2 field types for dbf file."""
+        if filename=='tvhabita':
+            return self.TVHABITA_TYPES
+        if filename=='tvabund':
+            return self.TVABUND_TYPES
+        if filename=='remarks':
+            return self.TVREMARKS_TYPES
+        return None
+
     def __repr__(self):
         if self.prjname is None:
             return f'{self.__class__.__name__} (n={len(self)})'
@@ -199,26 +239,46 @@ class Tv2Db:
     @property
     def tvabund(self):
         """Return table of species abundance data."""
-        tvabund = self._tvabund
-        
+        return self._sorted_tvabund().copy()
+
+    def _sorted_tvabund(self):
+        """Return cached table of species abundance data, the cached
+        table should not be changed."""
+        if (self._tvabund_cache is None
+                or self._tvabund_cache[0] is not self._tvabund):
+            self._tvabund_cache = (self._tvabund, self._get_tvabund())
+        return self._tvabund_cache[1]
+
+    def _get_tvabund(self):
+        """Return species abundance data sorted by releve, layer and
+        species."""
+
         # add missing columns
         # Note: older versies lack column "LAYER", but do have a column
         # "COVER_PERC")
-        for col in self.TVABUND_COLS:
-            if col not in tvabund.columns:
-                tvabund[col] = 0
-        
-        tvabund.sort_values(
-            ['RELEVE_NR','LAYER','SPECIES_NR']
-            ).reset_index(drop=True).copy()
+        missing = {col:0 for col in self.TVABUND_COLS
+            if col not in self._tvabund.columns}
+        tvabund = self._tvabund.assign(**missing)[self.TVABUND_COLS]
 
-        return tvabund[self.TVABUND_COLS]
+        return tvabund.sort_values(
+            ['RELEVE_NR','LAYER','SPECIES_NR']
+            ).reset_index(drop=True)
 
 
     @property
     def tvhabita(self):
         """Return table of releve metadata."""
-        return self._tvhabita.sort_values(['RELEVE_NR']).reset_index(drop=True)
+        return self._sorted_tvhabita().copy()
+
+    def _sorted_tvhabita(self):
+        """Return cached table of releve metadata sorted by releve,
+        the cached table should not be changed."""
+        if (self._tvhabita_cache is None
+                or self._tvhabita_cache[0] is not self._tvhabita):
+            tvhabita = self._tvhabita.sort_values(['RELEVE_NR']
+                ).reset_index(drop=True)
+            self._tvhabita_cache = (self._tvhabita, tvhabita)
+        return self._tvhabita_cache[1]
 
 
     @property
@@ -242,29 +302,27 @@ class Tv2Db:
         string of 25 charcters each and stored in REMARKS.dbf.
         """
 
-        rem1 = self._tvhabita[['RELEVE_NR','REMARKS']].set_index('RELEVE_NR')
+        rem1 = self._tvhabita[['RELEVE_NR','REMARKS']].copy()
         rem2 = self._remarks
 
-        for relid in rem1.index.values:
-        
-            # remark from TVHABITA
-            rem = rem1.loc[relid,'REMARKS']
-
-            # add rows from REMARKS.dbf
-            remarks_table = rem2[rem2['RELEVE_NR']==relid]
-            for substring in remarks_table['REMARKS'].values:
-                rem += substring
+        # join substrings from REMARKS.dbf for each releve, keeping the
+        # order of rows in REMARKS.dbf
+        substrings = rem2['REMARKS'].fillna('').groupby(
+            rem2['RELEVE_NR'], sort=False).agg(''.join)
+        substrings = rem1['RELEVE_NR'].map(substrings)
 
-            rem1.loc[relid,'REMARKS'] = rem
+        # add substrings to remark from TVHABITA
+        rem1['REMARKS'] = rem1['REMARKS'].where(substrings.isna(),
+            rem1['REMARKS'].fillna('') + substrings)
 
-        rem1 = rem1.reset_index(drop=False).sort_values('RELEVE_NR')
+        rem1 = rem1.reset_index(drop=True).sort_values('RELEVE_NR')
         return rem1
 
 
     @property
     def years(self):
         """Years of releves."""
-        allyears = list(self.tvhabita['DATE'].str[:4].unique())
+        allyears = list(self._sorted_tvhabita()['DATE'].str[:4].unique())
         allyears = [year for year in allyears if year is not None]
         return allyears
 
@@ -272,9 +330,10 @@ class Tv2Db:
     @property
     def usercols(self):
         """Names of user defined columns."""
-        if self.tvhabita.empty:
+        tvhabita = self._sorted_tvhabita()
+        if tvhabita.empty:
             return []
-        return [col for col in self.tvhabita.columns if col not in self.TVHABITA_COLS]
+        return [col for col in tvhabita.columns if col not in self.TVHABITA_COLS]
 
 
     @property
@@ -288,7 +347,7 @@ class Tv2Db:
         """Contains all columns for a standard sbb database."""
         if self.is_empty:
             return False
-        return all(col in self.tvhabita.columns for col in self.SBB_COLS)
+        return all(col in self._tvhabita.columns for col in self.SBB_COLS)
 
     @property
     def flora(self):
@@ -315,9 +374,10 @@ class Tv2Db:
             return gdf
         
         # location data to dataframe
+        tvhabita = self._sorted_tvhabita()
         colnames = [col for col in self.LOCATION_COLUMNS  
-            if col in self.tvhabita.columns]
-        tvhab = self.tvhabita[colnames].copy()
+            if col in tvhabita.columns]
+        tvhab = tvhabita[colnames].copy()
 
         # modify columns
         tvhab['COVERSCALE'] = tvhab['COVERSCALE'].replace(self.COVERSCALES)
@@ -330,3 +390,77 @@ class Tv2Db:
         geom = gpd.points_from_xy(xcr,ycr)
         gdf = gpd.GeoDataFrame(tvhab,geometry=geom,crs='EPSG:28992')
         return gdf
+
+
+def _read_tv2_folder(folder, columns=None):
+    """Return tvhabita, tvabund and error for Turboveg2 folder."""
+    try:
+        db = Tv2Db(folder, columns=columns)
+        return db.tvhabita, db.tvabund, None
+    except Exception as err:
+        error = {'errtype':err.__class__.__name__, 'errmsg':repr(err),}
+        return None, None, error
+
+
+def load_tv2_folders(paths, workers=None, columns=None):
+    """Read releve data from many Turboveg2 folders.
+
+    Parameters
+    ----------
+    paths : list | dict
+        Paths to Turboveg2 folders, or dictionary of project name and
+        path. If a list is given, paths are used as project names.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of
+        processors. With workers=1 folders are read in the current
+        process.
+    columns : dict, optional
+        Columns to read from each dbf file, as for Tv2Db.
+
+    Returns
+    -------
+    tuple of (pd.DataFrame, pd.DataFrame, pd.DataFrame)
+        Header data and species abundance data of all folders with
+        project name as first index level, and a table of folders that
+        could not be read.
+
+    Example
+    -------
+    prj = SbbProjects(<root>)
+    tvdirs = prj.get_tv2projects(relpaths=False)['tvdir'].dropna()
+    tvhabita, tvabund, errors = load_tv2_folders(list(tvdirs), workers=8)
+    """
+    if not isinstance(paths, dict):
+        paths = {path:path for path in paths}
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    projects = list(paths.keys())
+    folders = [paths[prj] for prj in projects]
+    allcolumns = [columns]*len(folders)
+    if workers==1:
+        results = list(map(_read_tv2_folder, folders, allcolumns))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_read_tv2_folder, folders,
+                allcolumns))
+
+    tvhabita, tvabund, errors = {}, {}, []
+    for prj, folder, (tvhab, tvabu, error) in zip(projects, folders, results):
+        if error is not None:
+            errors.append({'project':prj, 'fpath':folder, **error})
+            continue
+        tvhabita[prj] = tvhab
+        tvabund[prj] = tvabu
+
+    if tvhabita:
+        tvhabita = pd.concat(tvhabita, names=['project',None])
+        tvabund = pd.concat(tvabund, names=['project',None])
+    else:
+        # empty tables with the same index levels as read tables
+        index = pd.MultiIndex.from_arrays([[],[]], names=['project',None])
+        tvhabita = DataFrame(index=index, columns=Tv2Db.TVHABITA_COLS)
+        tvabund = DataFrame(index=index, columns=Tv2Db.TVABUND_COLS)
+    errors = DataFrame(errors,
+        columns=['project','fpath','errtype','errmsg'])
+    return tvhabita, tvabund, errors
@@ -6,17 +6,127 @@ import numpy as _np
 from pandas import Series, DataFrame
 import pandas as _pd
 
-#from .._core._releve import Releve
+from .._core._releve import Releve
+
+
+def _iterparse_plots(context):
+    """Yield Plot elements from iterparse context and remove them from
+    the tree after use."""
+    for event, plot in context:
+        yield plot
+        plot.clear()
+        plot.getparent().remove(plot)
+
+
+class _PlotRecords:
+    """Collect releve data from Turboveg XML Plot elements.
+
+    All tables (header data, species data, releve metadata and user 
+    defined header field definitions) are filled from a single pass 
+    over the Plot elements.
+    """
+
+    def __init__(self):
+        self.guids = []
+        self.databases = []
+        self.releve_nrs = []
+        self.header = []
+        self.metadata = []
+        self.udf_fields = {}
+
+        # species data are stored by column, species_start is the
+        # position of the first species of each plot
+        self.species_start = []
+        self.species_nr = []
+        self.cover_code = []
+        self.layer = []
+
+    def __len__(self):
+        return len(self.metadata)
+
+    def add(self, plot):
+        """Add data from Plot element."""
+        guid = plot.attrib['guid'].strip('{').strip('}')
+        database = plot.attrib['database']
+        releve_nr = plot.attrib['releve_nr']
+        self.guids.append(guid)
+        self.databases.append(database)
+        self.releve_nrs.append(releve_nr)
+
+        # releve metadata
+        self.metadata.append(dict(plot.attrib))
+
+        # standard header attributes
+        header = {'guid':guid, 'database':database, 'releve_nr':releve_nr,}
+        standard = plot.find(".//header_data//standard_record")
+        if standard is not None:
+            header.update(standard.attrib)
+
+        # user defined header attributes
+        for rec in plot.iterfind(".//header_data//udf_record"):
+            header[rec.attrib['name']] = rec.attrib['value']
+            field = (rec.attrib['name'], rec.attrib['type'], 
+                int(rec.attrib['len']), int(rec.attrib['dec']),
+                rec.attrib['ispredefined'],)
+            self.udf_fields[field] = None
+        self.header.append(header)
+
+        # species abundance
+        self.species_start.append(len(self.species_nr))
+        for spec in plot.iterfind(".//species_data//species//standard_record"):
+            self.species_nr.append(spec.attrib['nr'])
+            self.cover_code.append(spec.attrib['cover'])
+            self.layer.append(spec.attrib['layer'])
+
+    def get_header(self):
+        """Return header data with values as strings."""
+        return _pd.DataFrame(self.header)
+
+    def get_species(self):
+        """Return species abundance data."""
+
+        # repeat plot identifiers for each species in plot
+        counts = _np.diff(self.species_start + [len(self.species_nr)])
+        plotrows = _np.repeat(_np.arange(len(self.guids)), counts)
+
+        species = _pd.DataFrame({
+            'guid' : _pd.Categorical(self.guids).take(plotrows),
+            'database' : _pd.Categorical(self.databases).take(plotrows),
+            'releve_nr' : _np.array(self.releve_nrs, dtype='int64')[plotrows],
+            'species_nr' : _np.array(self.species_nr, dtype='int64'),
+            'cover_code' : _pd.Categorical(self.cover_code),
+            'layer' : self.layer,
+            })
+        return species
+
+    def get_metadata(self):
+        """Return releve database metadata."""
+        metadata = _pd.DataFrame(self.metadata)
+        metadata['releve_nr'] = metadata['releve_nr'].astype('int64')
+        metadata.set_index('guid', drop=True, inplace=True, 
+            verify_integrity=True)
+        return metadata
+
+    def get_udf_fields(self):
+        """Return definitions of user defined header fields."""
+        colnames = ['field_name','field_type','field_len','field_dec',
+            'ispredefined',]
+        udf = _pd.DataFrame.from_records(list(self.udf_fields), 
+            columns=colnames)
+        return udf.set_index('field_name', drop=True)
+
 
 class TvXml:
     """Read Turboveg XML file."""
     
-    def __init__(self, tree):
+    def __init__(self, tree, xmlpath=None):
         """
         Parameters
         ----------
         tree : ElementTree tree object
             Valid XML tree with Turboveg releve dataset.
+        xmlpath : str, optional
+            Filepath of XML source file.
 
         Notes
         -----
@@ -26,21 +136,44 @@ class TvXml:
         self._tree = tree
         self._root = self._tree.getroot()
         self.xmlinfo = _pd.Series(self._root.attrib, name='xmlinfo')
+        self._xmlpath = xmlpath
+
+        # releve tables are read from all Plot elements in one pass
+        # on first access
+        self._plots = None
+        self._tvhabita = None
+        self._tvabund = None
+        self._releve_metadata = None
+        self._udf_fields = None
+
+        # indexes for fast access to single releves
+        self._guid_index = None
+        self._tvflora = None
+
+        # table definitions are read from the tree once
+        self._templates = None
+        self._tvhabita_template = None
+        self._header_dtypes = None
 
     def __repr__(self):
         return f'{self.__class__.__name__}(n={len(self)})'
 
     def __len__(self):
-        return len(self.guids)
+        return len(self._plotrecords)
 
     @classmethod
-    def from_file(cls,xmlpath):
+    def from_file(cls,xmlpath,read_plots=True):
         """Read Turboveg XML file.
 
         Parameters
         ----------
         xmlpath : str
             Valid filepath to XML file with groundwater level measurements.
+        read_plots : bool, default True
+            Read releve data from all plots. If False, releve data are 
+            read from file on first access. Use read_plots=False with
+            method iter_releves() for files that are too large to fit 
+            in memory.
 
         Returns
         -------
@@ -49,12 +182,132 @@ class TvXml:
         Example
         -------
         tvxml = TvXml.from_file(<valid xml filepath>)
+
+        Notes
+        -----
+        The file is parsed in a single pass. Releve data are copied 
+        from each Plot element and the element is removed from the tree 
+        directly after, so only lookup tables and templates are kept 
+        in memory as XML.
         """
 
         if not os.path.isfile(xmlpath):
             raise ValueError(f'Invalid filepath: "{xmlpath}".')
-        tree = ET.parse(xmlpath)
-        return cls(tree)
+
+        plots = _PlotRecords()
+        context = ET.iterparse(xmlpath, events=('end',), tag='Plot')
+        for plot in _iterparse_plots(context):
+            if read_plots:
+                plots.add(plot)
+        tree = context.root.getroottree()
+
+        tvxml = cls(tree, xmlpath=xmlpath)
+        if read_plots:
+            tvxml._plots = plots
+        return tvxml
+
+    def _iter_plots(self):
+        """Yield Plot elements from source file or from tree."""
+        if self._xmlpath is None:
+            yield from self._root.iterfind('.//Plot')
+        else:
+            context = ET.iterparse(self._xmlpath, events=('end',), tag='Plot')
+            yield from _iterparse_plots(context)
+
+    @property
+    def _plotrecords(self):
+        """Return releve data from all Plot elements."""
+        if self._plots is None:
+            self._plots = _PlotRecords()
+            for plot in self._iter_plots():
+                self._plots.add(plot)
+        return self._plots
+
+    def iter_releves(self, chunksize=1000, releves=False):
+        """Iterate over releve data in chunks.
+
+        Parameters
+        ----------
+        chunksize : int, default 1000
+            Maximum number of releves in each chunk.
+        releves : bool, default False
+            Yield single Releve objects instead of chunks of tables.
+
+        Yields
+        ------
+        tuple of (pd.DataFrame, pd.DataFrame) | Releve
+            Header data and species abundance data for each chunk of 
+            releves, or a Releve object for each releve.
+
+        Notes
+        -----
+        Plot elements are read from the source file and removed from 
+        memory after each chunk, so memory use depends on chunksize and 
+        not on the size of the file.
+
+        Example
+        -------
+        tvxml = TvXml.from_file(<valid xml filepath>, read_plots=False)
+        for tvhabita, tvabund in tvxml.iter_releves(chunksize=5000):
+            ...
+        """
+        if chunksize<1:
+            raise ValueError(f'Invalid chunksize {chunksize}.')
+
+        plots = _PlotRecords()
+        for plot in self._iter_plots():
+            plots.add(plot)
+            if len(plots)==chunksize:
+                yield from self._get_chunk(plots, releves=releves)
+                plots = _PlotRecords()
+
+        if len(plots)!=0:
+            yield from self._get_chunk(plots, releves=releves)
+
+    def _get_chunk(self, plots, releves=False):
+        """Yield tables or Releve objects from chunk of plot records."""
+        template = self._get_tvhabita_template(udf=plots.get_udf_fields())
+        tvhabita = self._convert_header(plots.get_header(),
+            self._get_header_dtypes(template))
+        tvabund = plots.get_species()
+
+        if not releves:
+            yield tvhabita, tvabund
+            return
+
+        tvflora = self.tvflora
+        species = dict(list(tvabund.groupby('guid', sort=False, observed=True)))
+        for guid in tvhabita.index:
+            yield self._create_releve(tvhabita.loc[guid,:], 
+                species.get(guid, tvabund.iloc[:0]), tvflora)
+
+    def _create_releve(self, header, species, tvflora):
+        """Return Releve object from header data, species data and 
+        species list."""
+        releve = Releve()
+
+        # header data
+        fields = list(releve.tvhabita.index) + [field for field 
+            in header.index if field not in releve.tvhabita.index]
+        releve.tvhabita = header.astype('object').reindex(fields)
+        releve.tvhabita.name = 'tvhabita'
+        releve.tvhabita['releve_nr'] = header.name
+
+        # species data
+        tvabund = species[Releve.TVABUND_COLNAMES].reset_index(drop=True)
+        tvabund.index.name = 'entry'
+        releve.tvabund = tvabund
+
+        # species names
+        positions = tvflora.index.get_indexer(tvabund['species_nr'].unique())
+        tvflora = tvflora.iloc[_np.sort(positions[positions>=0])]
+        releve.tvflora = releve.tvflora.reindex(tvflora.index)
+        releve.tvflora['lettercode'] = tvflora['code']
+        releve.tvflora['shortname'] = tvflora['name']
+        releve.tvflora['abbreviat'] = tvflora['author']
+        releve.tvflora['nativename'] = tvflora['nativename']
+
+        return releve
 
     @property
     def lookuptables(self):
@@ -99,117 +352,94 @@ class TvXml:
     @property
     def guids(self):
         """Return list of unique releve identifier (guid) for each releve."""
-        return list(self.tvhabita.index.values)
+        return list(self._plotrecords.guids)
 
     @property
     def tvflora(self):
         """Return species table."""
-        tbl = self.get_lookuptable('Species_list')
-        tbl['nr'] = tbl['nr'].astype('int64')
-        ##tbl['valid_nr'] = tbl['valid_nr'].astype('int64')
-        tbl = tbl.set_index('nr',drop=True).sort_values('name')
-        tbl.index.name = 'species_nr'
-        return tbl
+        if self._tvflora is None:
+            tbl = self.get_lookuptable('Species_list')
+            tbl['nr'] = tbl['nr'].astype('int64')
+            ##tbl['valid_nr'] = tbl['valid_nr'].astype('int64')
+            tbl = tbl.set_index('nr',drop=True).sort_values('name')
+            tbl.index.name = 'species_nr'
+            self._tvflora = tbl
+        return self._tvflora
 
     @property
     def guidnumbers(self):
         """Return unique numbers for guids."""
-        guids = []
-        for plot in self._root.iterfind('.//Plot'):
-            guid = plot.attrib['guid'].strip('{').strip('}')
-            guids.append(guid)
+        guids = self.guids
         relnrs = list(range(1,len(guids)+1))
         return _pd.Series(relnrs, index=guids, name='relnrs')
 
     @property
     def tvhabita(self):
         """Turboveg2 standard header data."""
+        if self._tvhabita is None:
+            self._tvhabita = self._get_tvhabita()
+        return self._tvhabita
 
-        #releves = []
-        # get header data for all Plots
-        """
-        for plot in self._root.iterfind('.//Plot'):
-            # standard records
-            hd = _pd.Series(plot.find(".//header_data//standard_record").attrib)
-            hd = _pd.DataFrame(hd).T
-            # user defined records
-            for rec in plot.iterfind(".//header_data//udf_record"):
-                hd[rec.attrib['name']] = rec.attrib['value']
-            releves.append(hd)
-        tvhab = _pd.concat(releves)
-        """
-        releves = []
-        for plot in self._root.iterfind('.//Plot'):
-
-            plot_attributes = {}
-
-            # plot identifiers
-            for key in ['guid','database','releve_nr',]:
-                value = plot.attrib[key]
-                if key=='guid':
-                    value = value.strip('{').strip('}')
-                plot_attributes[key] = value
-            
-            # standard attributes
-            standard_attributes = plot.find(".//header_data//standard_record").attrib
-            for key in standard_attributes:
-                plot_attributes[key] = standard_attributes[key]
-            
-            # user defined records
-            for rec in plot.iterfind(".//header_data//udf_record"):
-                plot_attributes[rec.attrib['name']] = rec.attrib['value']
-
-            releves.append(plot_attributes.copy())
-        tvhab = _pd.DataFrame(releves)
-
-        # convert columns dtypes
-        for colname in tvhab.columns:
-            template = self.tvhabita_template.loc[colname,:]
-            if isinstance(template, DataFrame):
-                warnings.warn((f"Multipe definitions of field '{colname}':\n{str(template)}.'"))
-                #raise ValueError
-
-            elif (template['field_type']=='N'): 
-                # template is a series
-                if (template['field_dec']=='0'):
-                    tvhab[colname] = tvhab[colname].astype('Int64')
-                else:
-                    tvhab[colname] = tvhab[colname].astype('float64')
+    def _get_tvhabita(self):
+        """Return header data with converted column dtypes."""
+        return self._convert_header(self._plotrecords.get_header(),
+            self.header_dtypes)
 
-        # conver releve id
-        tvhab['releve_nr'] = tvhab['releve_nr'].astype('Int64')
+    def _convert_header(self, tvhab, dtypes):
+        """Return header data with converted dtypes and guid as index."""
+
+        # convert all column dtypes at once
+        dtypes = {colname:dtype for colname,dtype in dtypes.items()
+            if colname in tvhab.columns}
+        tvhab = tvhab.astype(dtypes)
 
         # set guid as index
         tvhab = tvhab.set_index('guid', drop=True)
 
         return tvhab
 
+    @property
+    def header_dtypes(self):
+        """Return dictionary of pandas dtypes for numeric header columns."""
+        if self._header_dtypes is None:
+            self._header_dtypes = self._get_header_dtypes(
+                self.tvhabita_template)
+        return self._header_dtypes
+
+    def _get_header_dtypes(self, template):
+        """Return dictionary of dtypes from header columns definitions."""
+        dtypes = {}
+        for colname in template.index.unique():
+            field = template.loc[colname,:]
+            if isinstance(field, DataFrame):
+                warnings.warn((f"Multipe definitions of field '{colname}':\n{str(field)}.'"))
+                continue
+            if field['field_type']=='N':
+                if field['field_dec']=='0':
+                    dtypes[colname] = 'Int64'
+                else:
+                    dtypes[colname] = 'float64'
+
+        # convert releve id
+        dtypes['releve_nr'] = 'Int64'
+        return dtypes
+
     @property
     def tvabund(self):
         """Species abundance data."""
-        releves = []
-        for plot in self._root.iterfind('.//Plot'):
-
-            species = []
-            for spec in plot.iterfind(".//species_data//species//standard_record"):
-                species.append({
-                    'guid' : plot.attrib['guid'].strip('{').strip('}'),
-                    'database': plot.attrib['database'],
-                    'releve_nr' : plot.attrib['releve_nr'],
-                    'species_nr' : spec.attrib['nr'],
-                    'cover_code' : spec.attrib['cover'],
-                    'layer' : spec.attrib['layer'],
-                    })
-            releves.append(_pd.DataFrame(species))
-
-        releves = _pd.concat(releves, ignore_index=True)
-        for colname in ['releve_nr','species_nr',]:
-            releves[colname] = releves[colname].astype('int64')
-        return releves
+        if self._tvabund is None:
+            self._tvabund = self._plotrecords.get_species()
+        return self._tvabund
 
     @property
     def tvhabita_template(self):
         """Return header columns definitions."""
+        if self._tvhabita_template is None:
+            self._tvhabita_template = self._get_tvhabita_template()
+        return self._tvhabita_template
+
+    def _get_tvhabita_template(self, udf=None):
+        """Return header columns definitions from templates and udf fields."""
 
         # table of releve identifiers
         identifiers = [
@@ -223,26 +453,13 @@ class TvXml:
         relid = _pd.DataFrame(identifiers).set_index('field_name')
 
         # table of turboveg predefined columns
-        tvcol = self.templates['tvhabita']
-        tvcol['ispredefined'] = 'true'
+        tvcol = self.templates['tvhabita'].assign(ispredefined='true')
         
         # table of user defined (udf) header columns
-        data = []
-        for releve in self._tree.findall(".//Plot/header_data"):
-            for rec in releve.iterchildren():
-                if rec.tag!='udf_record':
-                    continue
-                data.append({
-                    'field_name' : rec.attrib['name'],
-                    'field_type' : rec.attrib['type'],
-                    'field_len' : int(rec.attrib['len']),
-                    'field_dec': int(rec.attrib['dec']),
-                    'ispredefined':rec.attrib['ispredefined'],
-                    })
-                    
-        colnames = data[0].keys()
-        udf = _pd.DataFrame.from_records(data,columns=colnames)
-        udf = udf.drop_duplicates().set_index('field_name',drop=True)
+        if udf is None:
+            if self._udf_fields is None:
+                self._udf_fields = self._plotrecords.get_udf_fields()
+            udf = self._udf_fields
 
         return _pd.concat([relid,tvcol,udf])
 
@@ -250,16 +467,9 @@ class TvXml:
     @property
     def releve_metadata(self):
         """Releve database metadata."""
-        metadata = []
-        for plot in self._root.iterfind('.//Plot'):
-            releve = _pd.Series(plot.attrib)
-            metadata.append(_pd.DataFrame(releve).T)
-        metadata = _pd.concat(metadata)
-
-        metadata['releve_nr'] = metadata['releve_nr'].astype('int64')
-        metadata.set_index('guid', drop=True, inplace=True, verify_integrity=True)
-
-        return metadata
+        if self._releve_metadata is None:
+            self._releve_metadata = self._plotrecords.get_metadata()
+        return self._releve_metadata
 
     @property
     def header_columns_standard(self):
@@ -329,45 +539,59 @@ class TvXml:
     @property
     def templates(self):
         """Dictionary of Turboveg2 table definitions."""
-        filedict = {}
-        for filenumber in range(len(self._template_files)):
-            tbl = self._template_fields
-            tbl = tbl[tbl['file_nr']==f'{str(filenumber+1)}'].copy()
-            tbl['field_name'] = tbl['field_name'].str.lower()
+        if self._templates is not None:
+            return self._templates
+
+        files = self._template_files
+        fields = self._template_fields
+        fields['field_name'] = fields['field_name'].str.lower()
+        field_names = ['field_name','field_type','field_len','field_dec','field_desc',]
 
-            filename = self._template_files.at[str(filenumber+1),'file_name']
-            field_names = ['field_name','field_type','field_len','field_dec','field_desc',]
+        filedict = {}
+        for filenumber in range(len(files)):
+            tbl = fields[fields['file_nr']==f'{str(filenumber+1)}']
+            filename = files.at[str(filenumber+1),'file_name']
             filedict[filename] = tbl[field_names].set_index('field_name',drop=True)
 
-        return filedict
+        self._templates = filedict
+        return self._templates
 
-    """
-    def get_releve(self, guid):
-        #Return releve by number.
+    @property
+    def _releve_index(self):
+        """Return dictionary of guid with row numbers in tvhabita and 
+        slices of rows in tvabund."""
+        if self._guid_index is None:
+            plots = self._plotrecords
+            stops = plots.species_start[1:] + [len(plots.species_nr)]
+            self._guid_index = {
+                guid:(row, slice(start,stop)) 
+                for row,(guid,start,stop) in enumerate(
+                zip(plots.guids,plots.species_start,stops))
+                }
+        return self._guid_index
 
-        releve = Releve()
+    def get_releve(self, guid):
+        """Return releve by guid.
 
-        # get species names
-        species_nrs = self.tvabund['species_nr'].values
-        mask = self.tvflora.index.isin(species_nrs)
-        tvflora = self.tvflora[mask].copy()
+        Parameters
+        ----------
+        guid : str
+            Unique releve identifier, with or without curly brackets.
 
-        # species data
-        releve.tvflora.reindex(tvflora.index)
-        releve.tvflora['lettercode'] = tvflora['code']
-        releve.tvflora['shortname'] = tvflora['name']
-        releve.tvflora['abbreviat'] = tvflora['author']
-        releve.tvflora['nativename'] = tvflora['nativename']
-        
-        # select tvhabita data and copy to series
-        tvhabita = self.tvhabita.loc[guid,:]
-        for (field,value) in tvhabita.items():
-            releve.tvhabita[field] = value
-        releve.tvhabita['releve_nr'] = guid
+        Returns
+        -------
+        Releve
 
-        # tvabund data
-        tvabund = self.tvabund[self.tvabund['guid']==guid]
-        releve.tvabund = _pd.concat([releve.tvabund, tvabund,]).reset_index(drop=True)
+        Notes
+        -----
+        An index of guids is created on first use, after that single 
+        releves are returned without searching all releve data.
+        """
+        guid = guid.strip('{').strip('}')
+        try:
+            row, species = self._releve_index[guid]
+        except KeyError as e_info:
+            raise KeyError(f'No releve with guid "{guid}".')
 
-        return releve
-    """
\ No newline at end of file
+        return self._create_releve(self.tvhabita.iloc[row],
+            self.tvabund.iloc[species], self.tvflora)
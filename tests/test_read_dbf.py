@@ -0,0 +1,74 @@
+
+import pytest
+import struct
+from importlib import resources
+from pandas import DataFrame, isna
+
+from phylia.io import DbfFile
+from phylia.data import _data_turboveg2
+
+@pytest.fixture
+def dbf():
+    fpath = resources.files(_data_turboveg2).joinpath('Floranld') / 'species.dbf'
+    return DbfFile(fpath)
+
+def test_invalid_filepath():
+    with pytest.raises(ValueError) as e_info:
+        DbfFile('no valid filepath')
+
+def test_len(dbf):
+    assert len(dbf)>0
+
+def test_repr(dbf):
+    assert isinstance(str(dbf),str)
+
+def test_fields(dbf):
+    assert isinstance(dbf.fields, DataFrame)
+    assert dbf.columns[0]=='SPECIES_NR'
+
+def test_to_frame(dbf):
+    df = dbf.to_frame()
+    assert isinstance(df, DataFrame)
+    assert len(df)==len(dbf)
+    assert df['SPECIES_NR'].dtype=='int64'
+    assert df['AUTHOR'].notnull().any()
+
+def test_to_frame_columns(dbf):
+    df = dbf.to_frame(columns=['SPECIES_NR','LETTERCODE'])
+    assert list(df.columns)==['SPECIES_NR','LETTERCODE']
+    assert len(df)==len(dbf)
+    with pytest.raises(KeyError) as e_info:
+        dbf.to_frame(columns=['bad_column'])
+
+def _write_dbf(fpath, fields, records):
+    """Write dBase III file with fields as (name, type, length, dec)."""
+    headerlen = 32 + 32*len(fields) + 1
+    recordlen = 1 + sum(length for name, ftype, length, dec in fields)
+    header = struct.pack('<B3xIHH20x', 3, len(records), headerlen, recordlen)
+    for name, ftype, length, dec in fields:
+        header += struct.pack('<11sc4xBB14x', name.encode('ascii'),
+            ftype.encode('ascii'), length, dec)
+    header += b'\r'
+    body = b''.join(b' ' + b''.join(value.ljust(length)
+        for value, (name, ftype, length, dec) in zip(record, fields))
+        for record in records)
+    fpath.write_bytes(header + body + b'\x1a')
+    return fpath
+
+def test_fieldtypes_text_not_numeric(tmp_path):
+    fpath = _write_dbf(tmp_path / 'tvhabita.dbf',
+        [('RELEVE_NR','N',6,0),('COV_TOTAL','C',3,0)],
+        [[b'     1',b'ab'],[b'     2',b'50']])
+    df = DbfFile(fpath).to_frame(fieldtypes={'COV_TOTAL':'N'})
+    assert list(df['COV_TOTAL'])==['ab','50']
+    assert list(df['RELEVE_NR'])==[1,2]
+
+def test_corrupt_numeric_field(tmp_path):
+    fpath = _write_dbf(tmp_path / 'tvhabita.dbf',
+        [('RELEVE_NR','N',6,0),('COV_TOTAL','N',5,1)],
+        [[b'     1',b' 12.5'],[b'     2',b'  x#~'],[b'    3x',b'     ']])
+    df = DbfFile(fpath).to_frame()
+    assert df['COV_TOTAL'].iloc[0]==12.5
+    assert df['COV_TOTAL'].iloc[1:].isna().all()
+    assert df['RELEVE_NR'].iloc[:2].tolist()==[1,2]
+    assert isna(df['RELEVE_NR'].iloc[2])
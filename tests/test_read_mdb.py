@@ -3,6 +3,10 @@ import pytest
 from collections import OrderedDict
 from pandas import DataFrame
 import pandas as pd
+try:
+    import pyodbc
+except ImportError:
+    pyodbc = None
 
 from phylia.io import Mdb
 
@@ -14,22 +18,41 @@ def root():
 def goodpath(root):
     return root+'Drenthe\\Dr 0007_Hijken_1989\\7_Hijken.mdb'
 
+@pytest.fixture(params=['odbc','jet'])
+def backend(request):
+    """Run tests for both backends, backend odbc requires pyodbc."""
+    if request.param=='odbc' and pyodbc is None:
+        pytest.skip('backend odbc requires package pyodbc')
+    return request.param
+
 @pytest.fixture
-def mdb(goodpath):
-    return Mdb(goodpath)
+def mdb(goodpath, backend):
+    return Mdb(goodpath, backend=backend)
 
 @pytest.fixture
 def badpath():
+    """Return path to Jet 3 (Access 97) file, that can not be opened
+    with backend odbc but can be read with backend jet."""
     return r'.\data\badfiles\532_Nieuwezuiderlingedijk.mdb'
 
 @pytest.fixture
-def badmdb(badpath):
-    return Mdb(badpath)
+def badmdb(badpath, backend):
+    return Mdb(badpath, backend=backend)
+
+@pytest.fixture
+def corruptpath(tmp_path):
+    """Return path to file that can not be read by any backend."""
+    fpath = tmp_path / 'corrupt.mdb'
+    fpath.write_bytes(b'not an mdb file'*1000)
+    return str(fpath)
 
    
-def test_mdb_len(mdb,badmdb):
+def test_mdb_len(mdb,badmdb,backend):
     assert len(mdb)!=0
-    assert len(badmdb)==0
+    if backend=='odbc':
+        assert len(badmdb)==0
+    else:
+        assert len(badmdb)!=0
 
 def test_mdb_repr(mdb, badmdb):
     assert isinstance(str(mdb),str)
@@ -50,16 +73,64 @@ def test_get_table(mdb):
         tbl = mdb.get_table(name)
         assert isinstance(tbl,DataFrame)
 
+def test_get_table_columns(mdb, backend):
+    if backend=='jet':
+        pytest.skip('argument where is only supported by backend odbc')
+    res = mdb.get_table('Element', columns=['intern_id'], where='intern_id>0',
+        batchsize=10)
+    assert list(res.columns)==['intern_id']
+    assert not res.empty
+
+def test_get_table_columns_jet(goodpath):
+    jetmdb = Mdb(goodpath, backend='jet')
+    res = jetmdb.get_table('Element', columns=['intern_id'], batchsize=10)
+    assert list(res.columns)==['intern_id']
+    assert not res.empty
+    with pytest.raises(ValueError):
+        jetmdb.get_table('Element', where='intern_id>0')
+
+@pytest.mark.skipif(pyodbc is None, reason='requires package pyodbc')
+def test_jet_backend(goodpath):
+    mdb = Mdb(goodpath, backend='odbc')
+    jetmdb = Mdb(goodpath, backend='jet')
+    assert jetmdb.tablenames==mdb.tablenames
+    res = jetmdb.get_table('Element')
+    assert isinstance(res, DataFrame)
+    assert len(res)==len(mdb.get_table('Element'))
+
+def test_invalid_backend(goodpath):
+    with pytest.raises(ValueError) as e_info:
+        Mdb(goodpath, backend='bad_backend')
+
 def test_all_tables(mdb):
     res = mdb.all_tables
     assert isinstance(res,OrderedDict)
     assert list(res.keys())==mdb.tablenames
 
-def test_read_error(goodpath, badpath):
-    goodmdb = Mdb(goodpath)
+def test_read_error(goodpath, badpath, corruptpath, backend):
+    goodmdb = Mdb(goodpath, backend=backend)
     assert goodmdb.read_error is None
-    badmdb = Mdb(badpath)
-    assert isinstance(badmdb.read_error,dict)
+    badmdb = Mdb(badpath, backend=backend)
+    if backend=='odbc':
+        assert isinstance(badmdb.read_error,dict)
+    else:
+        assert badmdb.read_error is None
+    corruptmdb = Mdb(corruptpath, backend=backend)
+    assert isinstance(corruptmdb.read_error,dict)
+
+def test_close(goodpath, backend):
+    with Mdb(goodpath, backend=backend) as mdb:
+        assert not mdb.closed
+        assert len(mdb.tablenames)!=0
+    assert mdb.closed
+    assert mdb.tablenames==[]
+
+def test_open_many(goodpath, corruptpath, backend):
+    tables, errors = Mdb.open_many([goodpath, corruptpath],
+        tables=['Element','Versie'], max_open=2, backend=backend)
+    assert list(tables.keys())==[goodpath]
+    assert list(tables[goodpath].keys())==['Element','Versie']
+    assert list(errors['fpath'])==[corruptpath]
 
 
 """ For developing:
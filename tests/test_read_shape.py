@@ -85,3 +85,30 @@ def test_empty_shape(emptyshapepath):
     readr = ShapeFile(emptyshapepath)
     assert readr.shape.empty
 
+
+def test_fixed_rings(badshapepath):
+    """Test if feature with invalid polygon ring is repaired"""
+    readr = ShapeFile(badshapepath)
+    assert 234 in readr.shape.index
+    assert 368 not in readr.shape.index
+    err = readr.shape_errors.set_index('fid')
+    assert 'less than three nodes' in err.loc[234,'error']
+
+def test_repair_geometries():
+    """Test repair of geometries as array"""
+    import shapely
+    from phylia.io._georepair import repair_geometries
+    bowtie = shapely.from_wkt('POLYGON ((0 0, 2 2, 2 0, 0 2, 0 0))')
+    spike = shapely.polygons([(0,0),(1,0),(1,1),(0,0)],
+        holes=[[(0.1,0.1),(0.2,0.1),(0.1,0.1),(0.1,0.1)]])
+    geoms, report = repair_geometries([bowtie, None, spike,
+        shapely.box(0,0,1,1)], fids=[1,2,3,4])
+    assert shapely.is_valid(geoms[[0,2,3]]).all()
+    assert geoms[1] is None
+    assert geoms[0].geom_type=='MultiPolygon'
+    assert shapely.get_num_interior_rings(geoms[2])==0
+    report = report.set_index('fid')
+    assert list(report.index)==[1,2,3]
+    assert report.loc[1,'invalid']
+    assert report.loc[2,'dropped']
+    assert report.loc[3,'badrings']==1
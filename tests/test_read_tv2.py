@@ -5,7 +5,7 @@ from pandas import DataFrame
 from geopandas import GeoDataFrame
 import pandas as pd
 
-from phylia.io import Tv2Db
+from phylia.io import Tv2Db, load_tv2_folders
 
 @pytest.fixture
 def db():
@@ -45,4 +45,64 @@ def test_locations(db):
 
 def test_usercols(db):
     assert isinstance(db.usercols, list)
-    assert len(db.usercols)>0
\ No newline at end of file
+    assert len(db.usercols)>0
+
+def test_remarks_concatenated(tmp_path):
+    # continuation rows of remarks are appended in order, for many
+    # releves with two continuation rows each
+    db = Tv2Db(tmp_path)
+    relnrs = list(range(1,100001))
+    db._tvhabita = DataFrame({'RELEVE_NR':relnrs,
+        'REMARKS':['a'*56]*len(relnrs)})
+    db._remarks = DataFrame({'RELEVE_NR':relnrs+relnrs,
+        'REMARKS':['b'*25]*len(relnrs)+['c'*25]*len(relnrs)})
+    remarks = db.remarks
+    assert len(remarks)==len(relnrs)
+    assert (remarks['REMARKS']=='a'*56+'b'*25+'c'*25).all()
+
+def test_columns():
+    folder = r'.\data\sbbprojects\Drenthe\Dr 0007_Hijken_1989\TV_7\\'
+    db = Tv2Db(folder, columns={'tvabund':['RELEVE_NR','SPECIES_NR']})
+    assert list(db._tvabund.columns)==['RELEVE_NR','SPECIES_NR']
+
+def test_tvabund_cache(db):
+    tvabund = db.tvabund
+    cached = db._tvabund_cache[1]
+    db.tvabund
+    assert db._tvabund_cache[1] is cached
+    assert tvabund['RELEVE_NR'].is_monotonic_increasing
+    db._tvabund = db._tvabund.iloc[:10]
+    assert len(db.tvabund)==10
+
+def test_cached_tables_unchanged(db):
+    tvabund = db.tvabund
+    tvabund['NEWCOL'] = 1
+    tvabund.loc[0,'SPECIES_NR'] = -1
+    assert 'NEWCOL' not in db.tvabund.columns
+    assert db.tvabund.loc[0,'SPECIES_NR']!=-1
+    tvhabita = db.tvhabita
+    usercols = db.usercols
+    tvhabita['NEWCOL'] = 1
+    tvhabita['DATE'] = None
+    assert 'NEWCOL' not in db.tvhabita.columns
+    assert db.usercols==usercols
+    assert len(db.years)>0
+
+def test_load_tv2_folders():
+    folder = r'.\data\sbbprojects\Drenthe\Dr 0007_Hijken_1989\TV_7\\'
+    tvhabita, tvabund, errors = load_tv2_folders(
+        {'Hijken':folder, 'bad':'no valid folder path'}, workers=2)
+    assert list(tvhabita.index.unique('project'))==['Hijken']
+    assert not tvabund.empty
+    assert list(errors['project'])==['bad']
+
+def test_load_tv2_folders_all_bad():
+    tvhabita, tvabund, errors = load_tv2_folders(
+        {'bad1':'no valid folder path', 'bad2':'no valid folder path'},
+        workers=1)
+    for table in [tvhabita, tvabund]:
+        assert table.empty
+        assert list(table.index.names)==['project',None]
+        assert list(table.index.unique('project'))==[]
+    assert list(tvhabita.columns)==Tv2Db.TVHABITA_COLS
+    assert list(errors['project'])==['bad1','bad2']
@@ -0,0 +1,86 @@
+
+import pytest
+from pandas import Series, DataFrame
+import pandas as pd
+from geopandas import GeoDataFrame
+from shapely.geometry import box
+from phylia.io import MapData, MapCollection, MapElements, MapTables
+
+@pytest.fixture
+def filepaths():
+    srcdir = r'.\data\sbbprojects\Drenthe\\'
+    return DataFrame({
+        'mdbpath':[f'{srcdir}Dr 0470_Terhorst_2001\\470_Terhorst.mdb',
+            f'{srcdir}Dr 0061_Terhorst_1991\\61_Terhorst.mdb'],
+        'polypath':[f'{srcdir}Dr 0470_Terhorst_2001\\vlakken.shp',
+            f'{srcdir}Dr 0061_Terhorst_1991\\vlakken.shp'],
+        }, index=pd.Index(['Terhorst_2001','Terhorst_1991'], name='map_id'))
+
+@pytest.fixture
+def collection(filepaths):
+    collection, errors = MapCollection.from_filepaths(filepaths, workers=1)
+    return collection
+
+def test_empty_collection():
+    assert len(MapCollection())==0
+    assert MapCollection().get_area().empty
+
+def test_from_filepaths(collection):
+    assert len(collection)==2
+    assert isinstance(collection.polygons, GeoDataFrame)
+    assert list(collection.maps.index)==['Terhorst_2001','Terhorst_1991']
+
+def test_from_filepaths_errors(filepaths):
+    filepaths.loc['Terhorst_2001','mdbpath'] = 'invalid.mdb'
+    collection, errors = MapCollection.from_filepaths(filepaths, workers=1)
+    assert len(collection)==1
+    assert list(errors['map_id'])==['Terhorst_2001']
+
+def test_duplicate_elmid(filepaths):
+    row = filepaths.iloc[0]
+    shape = MapElements.from_shapefile(row['polypath']).shape
+    shape = pd.concat([shape, shape.iloc[:1]])
+    mapdata = MapData(maptables=MapTables.from_mdb(row['mdbpath']),
+        polygons=MapElements(shape=shape))
+    collection = MapCollection.from_mapdata([mapdata])
+    vegtype = mapdata.maptables.get_vegtype(loctype='v')
+    elmid = str(shape['elmid'].iloc[0])
+    nduplicate = (vegtype['elmid'].astype('str')==elmid).sum()
+    assert len(collection.get_vegtype())==len(vegtype)+nduplicate
+    polygons = collection._vegtype['polygon']
+    assert set(polygons[collection._vegtype['elmid'].astype('str')==elmid]
+        )=={0, len(shape)-1}
+
+def test_duplicate_elmid_without_vegtype():
+    shape = GeoDataFrame({'elmid':[1,1,2]},
+        geometry=[box(0,0,1,1), box(1,0,2,1), box(2,0,3,1)],
+        crs='epsg:28992')
+    mapdata = MapData(polygons=MapElements(shape=shape))
+    collection = MapCollection.from_mapdata([mapdata])
+    assert len(collection.polygons)==3
+    assert collection.get_vegtype().empty
+
+def test_from_mapdata(filepaths, collection):
+    maps = {map_id:MapData.from_filepaths(**row.to_dict())
+        for map_id, row in filepaths.iterrows()}
+    pd.testing.assert_series_equal(MapCollection.from_mapdata(maps).get_area(),
+        collection.get_area())
+
+def test_get_area(collection, filepaths):
+    area = collection.get_area(by='sbbcat_code', per='map_id')
+    assert area.index.names==['map_id','sbbcat_code']
+    mapdata = MapData.from_filepaths(**filepaths.iloc[0].to_dict())
+    vegtype = mapdata.get_vegtype()
+    expected = vegtype.groupby('sbbcat_code')['oppha'].sum()
+    pd.testing.assert_series_equal(area.loc['Terhorst_2001'], expected,
+        check_names=False)
+
+def test_get_area_per_year(collection):
+    area = collection.get_area(per='mapyear', weighted=True)
+    assert area.index.names==['mapyear','sbbcat_code']
+    assert area.sum()<=collection.get_area().sum()
+
+def test_query(collection):
+    geometry = collection.polygons.geometry.iloc[0]
+    polygons = collection.query(geometry)
+    assert 0 in polygons.index
@@ -1,5 +1,6 @@
 
 import pytest
+import numpy as np
 from pandas import Series, DataFrame
 import pandas as pd
 from geopandas import GeoSeries, GeoDataFrame
@@ -46,3 +47,61 @@ def test_get_abiotiek(mpd):
     assert isinstance(mpd.get_abiotiek(),GeoDataFrame)
 
 
+
+def test_query_points(mpd):
+    centroids = mpd.polygons.geometry.representative_point()
+    xy = np.column_stack([centroids.x, centroids.y])[:10]
+    tbl = mpd.query_points(xy)
+    assert set(tbl['point'])==set(range(10))
+    assert 'vegtype_code' in tbl.columns
+    elmids = mpd.polygons['elmid'].to_numpy()[:10]
+    assert (tbl['elmid'].to_numpy()==elmids[tbl['point']]).all()
+
+def test_query_bbox(mpd):
+    xmin, ymin, xmax, ymax = mpd.polygons.total_bounds
+    tbl = mpd.query_bbox(xmin, ymin, xmax, ymax)
+    assert set(tbl['elmid'])==set(mpd.polygons['elmid'])
+
+def test_nearest(mpd):
+    xmin, ymin, xmax, ymax = mpd.polygons.total_bounds
+    tbl = mpd.nearest(np.array([[xmin-100, ymin-100]]))
+    assert (tbl['distance']>=100).all()
+    assert mpd.nearest(np.array([[xmin-100, ymin-100]]),
+        max_distance=50).empty
+
+def test_lazy_geometry(mpd):
+    lazy = MapData.from_filepaths(mdbpath=mpd._maptblpath,
+        polypath=mpd._polypath, linepath=mpd._linepath, lazy_geometry=True)
+    assert not lazy.has_geometry
+    vegtype = lazy.get_vegtype()
+    assert not isinstance(vegtype, GeoDataFrame)
+    expected = mpd.get_vegtype()
+    assert list(vegtype['elmid'])==list(expected['elmid'])
+    assert np.allclose(vegtype['oppha'], expected['oppha'])
+
+    # boundary does not change tables without geometry
+    assert isinstance(lazy.boundary, GeoSeries)
+    assert 'geometry' not in lazy.polygons.columns
+    assert not isinstance(lazy.get_vegtype(), GeoDataFrame)
+
+    lazy.load_geometry()
+    assert lazy.has_geometry
+    assert isinstance(lazy.polygons, GeoDataFrame)
+    assert isinstance(lazy.get_vegtype(), GeoDataFrame)
+
+def test_lazy_geometry_query(mpd):
+    lazy = MapData.from_filepaths(mdbpath=mpd._maptblpath,
+        polypath=mpd._polypath, linepath=mpd._linepath, lazy_geometry=True)
+    xmin, ymin, xmax, ymax = mpd.polygons.total_bounds
+    table = lazy.query_bbox(xmin, ymin, xmax, ymax)
+    assert len(table)==len(mpd.query_bbox(xmin, ymin, xmax, ymax))
+    assert lazy.has_geometry
+    assert isinstance(lazy.polygons, GeoDataFrame)
+
+def test_lazy_geometry_to_shapefile(mpd, tmp_path):
+    lazy = MapData.from_filepaths(mdbpath=mpd._maptblpath,
+        polypath=mpd._polypath, linepath=mpd._linepath, lazy_geometry=True)
+    table = lazy.to_shapefile('vegtype', filepath=str(tmp_path / 'lazy.shp'))
+    assert not table.empty
+    assert (tmp_path / 'lazy.shp').is_file()
+    assert lazy.has_geometry
@@ -48,6 +48,37 @@ def test_shape(poly,line):
     assert isinstance(poly.shape,GeoDataFrame)
     assert isinstance(line.shape,GeoDataFrame)
 
+def test_boundary_cached(poly):
+    boundary = poly.boundary
+    assert poly.boundary is boundary
+    assert len(boundary)==1
+    simplified = poly.simplified_boundary(tolerance=1.0)
+    assert simplified.iloc[0].covers(boundary.iloc[0])
+    assert poly.simplified_boundary(tolerance=1.0) is simplified
+
+def test_union_all_overlapping():
+    from shapely.geometry import box
+    union = MapElements._union_all([box(0,0,2,2), box(1,1,3,3)])
+    assert union.area==7
+
+def test_query(poly):
+    points = poly.shape.geometry.representative_point().values[:5]
+    pointpos, elmids = poly.query_points(points, predicate='within')
+    assert list(pointpos)==list(range(5))
+    assert list(elmids)==list(poly.shape['elmid'][:5])
+    xmin, ymin, xmax, ymax = poly.shape.total_bounds
+    assert len(poly.query_bbox(xmin, ymin, xmax, ymax))==len(poly)
+    pointpos, elmids, distances = poly.nearest(points)
+    assert (distances==0).all()
+
+def test_lazy(poly):
+    lazy = MapElements.from_shapefile(poly.filepath, lazy=True)
+    assert not lazy.is_loaded
+    assert len(lazy)==len(poly)
+    assert list(lazy.attributes['elmid'])==list(poly.shape['elmid'])
+    assert isinstance(lazy.shape, GeoDataFrame)
+    assert lazy.is_loaded
+
 """ For developing
 srcdir = r'.\data\DSprojects\Drenthe\Dr 0469_Hijken_2001\\'
 mdbpath = f'{srcdir}469_Hijken.mdb'
@@ -3,7 +3,10 @@
 import pytest
 from pandas import Series, DataFrame
 import pandas as pd
-from phylia.io import MapTables
+from phylia.io import MapTables, Mdb
+from phylia.io import _maptables
+from phylia.io._maptables import _join_indexer
+from phylia.io._dates import normalize_dates, format_dates
 
 @pytest.fixture
 def db():
@@ -34,6 +37,44 @@ def test_basics(db):
 def test_filepath(db):
     assert isinstance(db.filepath, str)
 
+def test_from_mdb_lazy():
+    srcdir = r'.\data\sbbprojects\Drenthe\Dr 0469_Hijken_2001\\'
+    db = MapTables.from_mdb(f'{srcdir}469_Hijken.mdb', lazy=True)
+    assert isinstance(db.get_mapyear(), int)
+    assert list(db._tbldict._tables.keys())==['Element']
+    assert isinstance(db.get_vegtype(), DataFrame)
+
+def test_from_mdb_lazy_closes_mdb(monkeypatch):
+    opened = []
+    class CountingMdb(Mdb):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            opened.append(self)
+    monkeypatch.setattr(_maptables, 'Mdb', CountingMdb)
+    srcdir = r'.\data\sbbprojects\Drenthe\Dr 0469_Hijken_2001\\'
+    db = MapTables.from_mdb(f'{srcdir}469_Hijken.mdb', lazy=True)
+    assert isinstance(db.get_mapyear(), int)
+    assert len(opened)==2
+    assert all(mdb.closed for mdb in opened)
+
+def test_from_mdb_cache(tmp_path):
+    srcdir = r'.\data\sbbprojects\Drenthe\Dr 0469_Hijken_2001\\'
+    db = MapTables.from_mdb(f'{srcdir}469_Hijken.mdb', cache_dir=tmp_path)
+    cached = MapTables.from_mdb(f'{srcdir}469_Hijken.mdb', cache_dir=tmp_path)
+    assert len(cached)==len(db)
+    assert cached.get_mapyear()==db.get_mapyear()
+
+@pytest.mark.parametrize('string_dtype', ['pyarrow','category','object'])
+def test_from_mdb_string_dtype(string_dtype, db):
+    typed = MapTables.from_mdb(db.filepath, string_dtype=string_dtype)
+    element = typed._tbldict['Element']
+    assert element['elmid'].dtype==MapTables.STRING_DTYPES[string_dtype]
+    assert len(typed.get_vegtype())==len(db.get_vegtype())
+
+def test_from_mdb_invalid_string_dtype(db):
+    with pytest.raises(ValueError):
+        MapTables.from_mdb(db.filepath, string_dtype='bad_dtype')
+
 def test_from_mdb_badfilepath():
     with pytest.raises(Exception) as e_info:
         MapTables.from_mdb('badpath.mdb')
@@ -62,6 +103,15 @@ def test_yearcounts(db):
 def test_get_mapyear(db):
     assert isinstance(db.get_mapyear(), int)
 
+def test_peek_mapyear(db, tmp_path):
+    assert MapTables.peek_mapyear(db.filepath)==db.get_mapyear()
+    MapTables.from_mdb(db.filepath, cache_dir=tmp_path)
+    year = MapTables.peek_mapyear(db.filepath, cache_dir=tmp_path)
+    assert year==db.get_mapyear()
+
+def test_peek_mapyear_invalid_format(db_invalid_format):
+    assert MapTables.peek_mapyear(db_invalid_format.filepath) is None
+
 def test_empty(db):
     assert not db.empty
 
@@ -69,9 +119,32 @@ def test_sbbcatalog(db):
     assert isinstance(db.sbbcatalog, DataFrame)
     assert not db.sbbcatalog.empty
 
+def test_get_vegtype_reuses_indexers(db):
+    vegtype = db.get_vegtype()
+    nindexers = len(db._indexers)
+    assert nindexers>0
+    pd.testing.assert_frame_equal(db.get_vegtype(), vegtype)
+    assert len(db._indexers)==nindexers
+
+def test_join_indexer():
+    left = pd.Series(['a','b',None,'c','a2'])
+    right = pd.Series(['b','a','b',None,'d'])
+    lidx, ridx = _join_indexer(left, right)
+    merged = pd.merge(left.to_frame('key').reset_index(),
+        right.to_frame('key').reset_index(), on='key', how='left')
+    assert list(lidx)==list(merged['index_x'])
+    assert list(ridx)==list(merged['index_y'].fillna(-1).astype(int))
+
+def test_format_dates():
+    values = pd.Series([pd.Timestamp('2001-07-01'), None, '2001-07-02',
+        'invalid'], dtype=object)
+    assert normalize_dates(values).isna().tolist()==[False,True,False,True]
+    assert format_dates(values).tolist()==['01072001','','02072001','']
+    assert format_dates(pd.Series(['01072001',None])).tolist()==['01072001','']
+
 """ For developing
 srcdir = '.\\data\\DSprojects\\Drenthe\\Dr 0469_Hijken_2001\\'
 mdbpath = f'{srcdir}469_Hijken.mdb'
 mdb = dsr.Mdb(mdbpath)
 db = dsr.MapTables.from_mdb(mdbpath)
-"""
\ No newline at end of file
+"""
@@ -29,12 +29,20 @@ def guidnumbers(tvxml):
 def releve_numbers(tvxml):
     assert isinstance(releve_numbers, list)
 
-"""
 def test_get_releve(tvxml):
     rel = tvxml.get_releve(tvxml.guids[0])
     assert isinstance(rel, Releve)
-    # todo: add test for releve not empty!
-"""
+    assert len(rel)>0
+    with pytest.raises(KeyError) as e_info:
+        tvxml.get_releve('bad_guid')
+
+def test_guids(tvxml):
+    assert len(tvxml.guids)==len(tvxml)
+    assert tvxml.guids==list(tvxml.tvhabita.index.values)
+
+def test_releve_metadata(tvxml):
+    assert isinstance(tvxml.releve_metadata, DataFrame)
+    assert len(tvxml.releve_metadata)==len(tvxml)
 
 def test_tvflora(tvxml):
     assert isinstance(tvxml.tvflora, DataFrame)
@@ -69,3 +77,24 @@ def test_templates(tvxml):
 
 def test_tvhabita_template(tvxml):
     assert isinstance(tvxml.tvhabita_template, DataFrame)
+
+def test_header_dtypes(tvxml):
+    dtypes = tvxml.header_dtypes
+    assert isinstance(dtypes, dict)
+    assert dtypes['releve_nr']=='Int64'
+    for colname,dtype in dtypes.items():
+        if colname in tvxml.tvhabita.columns:
+            assert tvxml.tvhabita[colname].dtype==dtype
+
+def test_iter_releves(tvxml):
+    chunks = list(tvxml.iter_releves(chunksize=5))
+    assert all(isinstance(tvhab, DataFrame) for tvhab, tvabund in chunks)
+    assert all(isinstance(tvabund, DataFrame) for tvhab, tvabund in chunks)
+    assert sum(len(tvhab) for tvhab, tvabund in chunks)==len(tvxml)
+    assert sum(len(tvabund) for tvhab, tvabund in chunks)==len(tvxml.tvabund)
+
+def test_iter_releves_releves():
+    tvxml = TvXml.from_file(xmlpath, read_plots=False)
+    releves = list(tvxml.iter_releves(chunksize=5, releves=True))
+    assert all(isinstance(rel, Releve) for rel in releves)
+    assert len(releves)==len(tvxml)